@@ -0,0 +1,61 @@
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+
+class FakeResponse:
+    def __init__(self, url: str, payload):
+        self.url = url
+        self._payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        if isinstance(self._payload, Exception):
+            raise self._payload
+        return self._payload
+
+
+def period_payload(url: str) -> list[list]:
+    """
+    The answer of the API to a period query: one row per month, country and product of the query
+    """
+    qs = parse_qs(urlparse(url).query)
+    start, end = qs["time"][0].replace("from ", "").split(" to ")
+    if "I_COMMODITY" in qs:
+        header = ["CTY_CODE", "CTY_NAME", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "time"]
+        products, values = qs["I_COMMODITY"], ["10", "5"]
+    else:
+        header = ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "time"]
+        products, values = qs["E_COMMODITY"], ["10"]
+    return [header] + [
+        [cty, "NAME", product, "desc", *values, month]
+        for month in pd.period_range(start, end, freq="M").strftime("%Y-%m")
+        for cty in qs["CTY_CODE"]
+        for product in products
+    ]
+
+
+class FakeAPI:
+    """
+    Stands for `requests.get`: answers every request with `payload`, or with `payload(url)` when it is callable
+    """
+
+    def __init__(self, payload=period_payload):
+        self.payload = payload
+        self.calls: list[str] = []
+
+    def __call__(self, url, timeout):
+        self.calls.append(url)
+        payload = self.payload(url) if callable(self.payload) else self.payload
+        return FakeResponse(url, payload)
+
+
+@pytest.fixture
+def api(monkeypatch) -> FakeAPI:
+    fake = FakeAPI()
+    monkeypatch.setattr(requests, "get", fake)
+    return fake
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from ustrade.analytics import rolling_sum, shares, yoy
+
+
+def _panel():
+    dates = pd.date_range("2019-01-01", periods=30, freq="MS")
+    frames = []
+    for cty, base in [("4279", 1.0), ("2010", 10.0)]:
+        frames.append(pd.DataFrame({
+            "date": dates,
+            "country_code": cty,
+            "product_code": "08",
+            "import_value": base * np.arange(1, 31),
+        }))
+    # shuffled on purpose: the metrics must not depend on the input order
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+
+def test_yoy_matches_same_month_of_previous_year():
+    df = _panel()
+    res = yoy(df)
+
+    row = df[(df["country_code"] == "2010") & (df["date"] == "2020-03-01")].index[0]
+    assert res[row] == 150.0 / 30.0 - 1
+    assert res[df["date"] < "2020-01-01"].isna().all()
+
+
+def test_rolling_sum_matches_pandas_rolling():
+    df = _panel()
+    res = rolling_sum(df, window=12, min_periods=12)
+
+    expected = (df.sort_values("date").groupby("country_code")["import_value"]
+                .rolling(12).sum().reset_index(level=0, drop=True))
+    pd.testing.assert_series_equal(res.sort_index(), expected.sort_index(), check_names=False)
+
+
+def test_incremental_yoy_with_history():
+    df = _panel()
+    new = df[df["date"] >= "2021-01-01"]
+    old = df[df["date"] < "2021-01-01"]
+
+    pd.testing.assert_series_equal(yoy(new, history=old), yoy(df).loc[new.index])
+
+
+def test_shares_sum_to_one_per_month():
+    df = _panel()
+    res = shares(df)
+    assert np.allclose(res.groupby(df["date"]).sum(), 1.0)
+
+
+def test_rolling_sum_min_periods_ignores_missing_values():
+    df = _panel()
+    df.loc[(df["country_code"] == "4279") & (df["date"] == "2019-12-01"), "import_value"] = np.nan
+    res = rolling_sum(df, window=12, min_periods=12)
+
+    expected = (df.sort_values("date").groupby("country_code")["import_value"]
+                .rolling(12, min_periods=12).sum().reset_index(level=0, drop=True))
+    pd.testing.assert_series_equal(res.sort_index(), expected.sort_index(), check_names=False)
+    assert res[(df["country_code"] == "4279") & (df["date"] == "2020-06-01")].isna().all()
@@ -146,3 +146,243 @@ def test_get_children_codes():
     expected_keys = {"100111", "100119", "100191", "100199"}
     assert set(children.keys()) == expected_keys
     assert "durum wheat" in children["100111"].lower()
+
+
+def test_update_fetches_only_tail_and_replaces_revised_months(monkeypatch):
+    called = []
+
+    def fake_get(url, timeout):
+        called.append(url)
+        header = ["CTY_CODE", "CTY_NAME", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "time"]
+        rows = [
+            ["4279", "FRANCE", "08", "Edible fruit", "99", "99", month]
+            for month in ["2020-05", "2020-06", "2020-07", "2020-08"]
+        ]
+        return FakeResponse(url, [header] + rows)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    held = pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=6, freq="MS"),
+        "country_name": "FRANCE",
+        "country_code": "4279",
+        "product_name": "Edible fruit",
+        "product_code": "08",
+        "import_value": 1.0,
+        "consumption_import_value": 1.0,
+    })
+
+    df = ut.update(held, end="2020-08", revision_months=2)
+
+    assert len(called) == 1
+    assert "time=from+2020-05+to+2020-08" in called[0]
+    assert len(df) == 8
+    assert df["date"].is_monotonic_increasing
+    assert list(df["import_value"]) == [1.0] * 4 + [99.0] * 4
+
+    # columns derived from the result are kept, empty on the refreshed rows
+    df = ut.update(held.assign(yoy=0.5), end="2020-08", revision_months=2)
+    assert list(df.columns) == list(held.columns) + ["yoy"]
+    assert df["yoy"].isna().tolist() == [False] * 4 + [True] * 4
+
+
+def test_release_calendar_skips_unpublished_months(monkeypatch):
+    called = []
+
+    def fake_get(url, timeout):
+        called.append(url)
+        if "get=CTY_CODE&" in url:
+            return FakeResponse(url, [["CTY_CODE", "time"], ["1220", "2020-02"], ["1220", "2020-03"]])
+        header = ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "time"]
+        return FakeResponse(url, [header, ["2010", "MEXICO", "27", "Mineral fuels", "1", "2020-03"]])
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient(release_calendar=True)
+    assert c.latest_month("exports") == "2020-03"
+    assert c.get_exports("Mexico", "27", "2020-04").empty
+
+    with pytest.raises(EmptyResult):
+        c.get_exports_on_period("Mexico", "27", "2020-05", "2020-09")
+
+    c.get_exports_on_period("Mexico", "27", "2020-01", "2020-09")
+    assert len(called) == 2
+    assert "time=from+2020-01+to+2020-03" in called[-1]
+
+
+def test_get_imports_with_fields_returns_projected_columns(monkeypatch):
+    def fake_get(url, timeout):
+        payload = [
+            ["CTY_CODE", "I_COMMODITY", "GEN_VAL_MO", "YEAR", "MONTH"],
+            ["4279", "08", "123.45", "2018", "03"],
+        ]
+        return FakeResponse(url, payload)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    df = ut.get_imports("France", "08", "2018-03", fields=["country_code", "product_code", "import_value"])
+    assert list(df.columns) == ["date", "country_code", "product_code", "import_value"]
+    assert df.loc[0, "import_value"] == 123.45
+
+
+def test_drop_descriptions_reattaches_local_names_and_counts_bytes(monkeypatch):
+    called = {}
+
+    class SizedResponse(FakeResponse):
+        headers = {"Content-Encoding": "gzip", "Content-Length": "40"}
+        content = b"x" * 100
+
+    def fake_get(url, timeout):
+        called["url"] = url
+        payload = [
+            ["CTY_CODE", "I_COMMODITY", "GEN_VAL_MO", "CON_VAL_MO", "YEAR", "MONTH"],
+            ["4279", "1001", "10", "10", "2018", "03"],
+        ]
+        return SizedResponse(url, payload)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient(drop_descriptions=True)
+    df = c.get_imports("France", "1001", "2018-03")
+
+    assert "CTY_NAME" not in called["url"] and "SDESC" not in called["url"]
+    assert df.loc[0, "country_name"] == "France"
+    assert "wheat" in df.loc[0, "product_name"].lower()
+
+    stats = c.transfers[-1]
+    assert stats.encoding == "gzip"
+    assert (stats.compressed_bytes, stats.decoded_bytes) == (40, 100)
+    assert c.transfer_summary() == {"requests": 1, "bytes_transferred": 40, "bytes_decoded": 100}
+
+
+def test_drop_descriptions_accepts_name_fields(monkeypatch):
+    called = {}
+
+    def fake_get(url, timeout):
+        called["url"] = url
+        payload = [
+            ["CTY_CODE", "GEN_VAL_MO", "YEAR", "MONTH"],
+            ["4279", "10", "2018", "03"],
+        ]
+        return FakeResponse(url, payload)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient(drop_descriptions=True)
+    df = c.get_imports("France", "1001", "2018-03", fields=["country_name", "import_value"])
+
+    assert "get=CTY_CODE%2CGEN_VAL_MO&" in called["url"]
+    assert list(df.columns) == ["date", "country_name", "import_value"]
+    assert df.loc[0, "country_name"] == "France"
+
+
+def test_drop_descriptions_keeps_api_names_of_codes_missing_locally(monkeypatch):
+    called = {}
+
+    def fake_get(url, timeout):
+        called["url"] = url
+        payload = [
+            ["CTY_CODE", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "YEAR", "MONTH"],
+            ["4279", "1001190000", "DURUM WHEAT", "10", "10", "2018", "03"],
+        ]
+        return FakeResponse(url, payload)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient(drop_descriptions=True)
+    df = c.get_imports("France", "1001190000", "2018-03")
+
+    assert "I_COMMODITY_SDESC" in called["url"]
+    assert df.loc[0, "product_name"] == "DURUM WHEAT"
+    assert df.loc[0, "country_name"] == "France"
+
+
+def test_compact_attaches_requested_name_fields(monkeypatch):
+    def fake_get(url, timeout):
+        return FakeResponse(url, [["CTY_CODE", "GEN_VAL_MO", "time"], ["4279", "10", "2020-01"]])
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient(compact=True)
+    df = c.get_imports_on_period("France", "1001", "2020-01", "2020-01", fields=["country_name", "import_value"])
+
+    assert list(df.columns) == ["date", "country_name", "import_value"]
+    assert df["country_name"].tolist() == ["France"]
+    assert isinstance(df["country_name"].dtype, pd.CategoricalDtype)
+
+
+def test_compact_results_use_categorical_codes_and_resolve_names(monkeypatch):
+    called = {}
+
+    def fake_get(url, timeout):
+        called["url"] = url
+        header = ["CTY_CODE", "E_COMMODITY", "ALL_VAL_MO", "time"]
+        rows = [["4279", "1001", "5", "2020-01"], ["2010", "1001", "7", "2020-01"], ["4279", "1001", "6", "2020-02"]]
+        return FakeResponse(url, [header] + rows)
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient(compact=True)
+    df = c.get_exports_on_period(["France", "Mexico"], "1001", "2020-01", "2020-02")
+
+    assert "CTY_NAME" not in called["url"]
+    assert isinstance(df["country_code"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["product_code"].dtype, pd.CategoricalDtype)
+    assert "country_name" not in df.columns
+
+    named = c.with_names(df)
+    assert list(named.columns[:5]) == ["date", "country_name", "country_code", "product_name", "product_code"]
+    assert set(named["country_name"]) == {"France", "Mexico"}
+    assert "wheat" in named.loc[0, "product_name"].lower()
+
+
+def test_get_imports_on_list_of_months_coalesces_runs(monkeypatch):
+    called = []
+
+    def fake_get(url, timeout):
+        called.append(url)
+        start = url.split("time=from+")[1].split("+to+")[0]
+        header = ["CTY_CODE", "CTY_NAME", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "time"]
+        return FakeResponse(url, [header, ["4279", "FRANCE", "08", "Edible fruit", "1", "1", start]])
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    df = ut.get_imports("France", "08", ["2019-12", "2018-12", "2019-01", "2020-12"])
+
+    assert sorted(u.split("time=")[1] for u in called) == [
+        "from+2018-12+to+2019-01",
+        "from+2019-12+to+2019-12",
+        "from+2020-12+to+2020-12",
+    ]
+    assert len(df) == 3
+    assert df["date"].is_monotonic_increasing
+
+
+def test_concurrent_identical_queries_share_one_request(monkeypatch):
+    import threading
+    import time
+
+    called = []
+
+    def fake_get(url, timeout):
+        called.append(url)
+        time.sleep(0.2)
+        header = ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "YEAR", "MONTH"]
+        return FakeResponse(url, [header, ["2010", "MEXICO", "27", "Mineral fuels", "10", "2010", "01"]])
+
+    monkeypatch.setattr(requests, "get", fake_get)
+
+    c = CensusClient()
+    results = []
+    queries = [(["Mexico", "FR"], ["27", "08"]), (["FR", "MX"], ["08", "27"])] * 3
+    threads = [threading.Thread(target=lambda q=q: results.append(c.get_exports(q[0], q[1], "2010-01")))
+               for q in queries]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(called) == 1
+    assert len(results) == 6
+    results[0].loc[0, "export_value"] = -1.0
+    assert all(df.loc[0, "export_value"] == 10.0 for df in results[1:])
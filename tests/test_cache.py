@@ -0,0 +1,202 @@
+import os
+import socketserver
+import threading
+import time
+
+import pytest
+import requests
+
+from ustrade.cache import LEASE_TTL, FileCache, MemoryCache, RedisCache, SQLiteCache
+from ustrade.client import CensusClient
+from ustrade.singleflight import SingleFlight
+
+
+PAYLOAD = [
+    ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "YEAR", "MONTH"],
+    ["2010", "MEXICO", "27", "Mineral fuels", "10", "2010", "01"],
+]
+
+
+class _RedisStandIn(socketserver.StreamRequestHandler):
+    """
+    Minimal server answering GET, SET (with NX / PX) and DEL in the Redis protocol
+    """
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while (args := self._read_command()) is not None:
+            cmd = args[0].upper()
+            if cmd == b"GET":
+                value = store.get(args[1])
+                self.wfile.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+            elif cmd == b"SET":
+                options = [a.upper() for a in args[3:]]
+                if b"NX" in options and args[1] in store:
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    store[args[1]] = args[2]
+                    self.wfile.write(b"+OK\r\n")
+            elif cmd == b"DEL":
+                self.wfile.write(b":%d\r\n" % int(store.pop(args[1], None) is not None))
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def redis_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RedisStandIn)
+    server.daemon_threads = True
+    server.store = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "file", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache()
+    if request.param == "sqlite":
+        return SQLiteCache(str(tmp_path / "cache.db"))
+    if request.param == "file":
+        return FileCache(str(tmp_path / "cache"))
+    server = request.getfixturevalue("redis_server")
+    return RedisCache(*server.server_address)
+
+
+def test_backend_get_set_delete_and_lease(backend):
+    assert backend.get("k") is None
+    backend.set("k", b"value")
+    assert backend.get("k") == b"value"
+    backend.delete("k")
+    assert backend.get("k") is None
+
+    assert backend.acquire("k", ttl=30)
+    assert not backend.acquire("k", ttl=30)
+    backend.release("k")
+    assert backend.acquire("k", ttl=30)
+
+    # without a duration the lease still ends
+    assert backend.acquire("no-ttl")
+    assert not backend.acquire("no-ttl")
+
+
+def test_empty_lock_file_expires(tmp_path):
+    cache = FileCache(str(tmp_path / "cache"))
+    path = cache._path("k", ".lock")
+    open(path, "w").close()
+    assert not cache.acquire("k", ttl=30)
+
+    # its owner died before writing it
+    os.utime(path, (time.time() - 60, time.time() - 60))
+    assert cache.acquire("k", ttl=30)
+
+
+def test_client_without_timeout_leases_queries(api):
+    api.payload = PAYLOAD
+    c = CensusClient(timeout=None, cache=MemoryCache())
+
+    assert c.lease_ttl == LEASE_TTL
+    assert len(c.get_exports("Mexico", "27", "2010-01")) == 1
+
+
+def test_memory_cache_expires_and_evicts():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", b"1", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+    assert cache.get("b") is None and cache.get("a") == b"1"
+
+
+def test_redis_cache_reconnects_after_fork(redis_server):
+    cache = RedisCache(*redis_server.server_address)
+    cache.set("a", b"1")
+    inherited = cache._sock
+
+    # as in a child forked while another thread of the parent was sending a command
+    cache._lock.acquire()
+    cache._pid = -1
+    assert cache.get("a") == b"1"
+    assert cache._sock is not inherited and not cache._lock.locked()
+
+
+def test_client_reuses_cached_response(api, tmp_path):
+    api.payload = PAYLOAD
+
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    first = CensusClient(cache=cache).get_exports("Mexico", "27", "2010-01")
+    second = CensusClient(cache=cache).get_exports("Mexico", "27", "2010-01")
+
+    assert len(api.calls) == 1
+    assert second.equals(first)
+
+
+def test_empty_answer_is_not_cached(api):
+    api.payload = requests.exceptions.JSONDecodeError("empty", "", 0)
+    c = CensusClient(cache=MemoryCache())
+    assert c._fetch_json("https://api.census.gov/query") is None
+    assert len(c.cache) == 0
+
+    api.payload = PAYLOAD
+    assert c._fetch_json("https://api.census.gov/query") == PAYLOAD
+    assert len(api.calls) == 2
+
+
+def test_concurrent_identical_queries_send_one_request(api):
+    def slow(url):
+        time.sleep(0.2)
+        return PAYLOAD
+
+    api.payload = slow
+
+    cache = MemoryCache()
+    clients = [CensusClient(cache=cache) for _ in range(4)]
+    results = []
+    threads = [threading.Thread(target=lambda c=c: results.append(c.get_exports("Mexico", "27", "2010-01")))
+               for c in clients]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(api.calls) == 1
+    assert len(results) == 4 and all(len(df) == 1 for df in results)
+    assert len({id(df) for df in results}) == 4
+
+
+def test_single_flight_reports_shared_results():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: [1]) == ([1], False)
+
+    started, results = threading.Event(), []
+
+    def slow():
+        started.set()
+        time.sleep(0.2)
+        return [2]
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait()
+    results.append(flight.do("k", lambda: [3]))
+    leader.join()
+
+    assert [shared for _, shared in results] == [True, True]
+    assert results[0][0] is results[1][0]
@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+
+from ustrade import export
+from ustrade.cli import main
+
+
+def test_extract_writes_partitions_and_resumes(api, tmp_path):
+    out = tmp_path / "out"
+    argv = ["extract", "--countries", "France,MX", "--products", "1001*", "--start", "2019-07",
+            "--end", "2020-12", "--output", str(out), "--format", "csv", "--months-per-shard", "6"]
+
+    assert main(argv) == 0
+    assert len(api.calls) == 3
+    assert sorted(os.listdir(out)) == ["_checkpoint.jsonl", "year=2019", "year=2020"]
+
+    total = sum(len(pd.read_csv(os.path.join(root, f)))
+                for root, _, files in os.walk(out) for f in files if f.endswith(".csv"))
+    assert total == 18 * 2 * 4
+
+    assert main(argv) == 0
+    assert len(api.calls) == 3
+
+
+def test_extract_refuses_to_resume_with_other_options(api, tmp_path, capsys):
+    out = tmp_path / "out"
+    argv = ["extract", "--countries", "France", "--products", "1001", "--start", "2020-01",
+            "--end", "2020-06", "--output", str(out), "--format", "csv"]
+    assert main(argv) == 0
+
+    assert main(argv + ["--dataset", "porths"]) == 2
+    assert "dataset: 'hs' -> 'porths'" in capsys.readouterr().err
+    assert len(api.calls) == 1
+
+
+def test_extract_reports_missing_pyarrow(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(export, "find_spec", lambda name: None)
+    argv = ["extract", "--countries", "France", "--products", "1001", "--start", "2020-01",
+            "--end", "2020-06", "--output", str(tmp_path / "out")]
+
+    assert main(argv) == 2
+    assert "requires pyarrow" in capsys.readouterr().err
+
+
+def test_extract_sizes_auto_shards_from_a_first_request(api, tmp_path):
+    out = tmp_path / "out"
+    argv = ["extract", "--countries", "France", "--products", "1001", "--start", "2015-01",
+            "--end", "2020-12", "--output", str(out), "--format", "csv", "--months-per-shard", "auto"]
+
+    assert main(argv) == 0
+    # the first year is fetched alone, the fast answer lets the remaining five years go in one request
+    assert len(api.calls) == 2
+    assert "time=from+2015-01+to+2015-12" in api.calls[0]
+    assert "time=from+2016-01+to+2020-12" in api.calls[1]
+
+    assert main(argv) == 0
+    assert len(api.calls) == 2
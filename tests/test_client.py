@@ -52,3 +52,43 @@ def test_normalize_country_rejects_unknown_country():
     with pytest.raises(ValueError):
         c._normalize_country("Neverland")
 
+
+
+def test_build_params_enduse_dataset():
+    c = CensusClient()
+    url = c._build_params("Mexico", "40000", "exports", date="2013-01", dataset="enduse")
+    parsed, qs = _parse(url)
+
+    assert parsed.path.endswith("/data/timeseries/intltrade/exports/enduse")
+    assert qs["get"] == ["CTY_CODE,CTY_NAME,E_ENDUSE,E_ENDUSE_LDESC,ALL_VAL_MO"]
+    assert qs["E_ENDUSE"] == ["40000"]
+
+
+def test_build_params_port_dataset_and_unknown_dataset():
+    c = CensusClient()
+    url = c._build_params("Mexico", "27", "imports", start="2013-01", end="2013-06", dataset="porths")
+    parsed, qs = _parse(url)
+
+    assert parsed.path.endswith("/data/timeseries/intltrade/imports/porths")
+    assert "PORT" in qs["get"][0].split(",")
+    assert qs["I_COMMODITY"] == ["27"]
+
+    with pytest.raises(ValueError):
+        c._build_params("Mexico", "27", "imports", date="2013-01", dataset="sitc")
+
+
+def test_build_params_projects_fields_and_pushes_predicates():
+    c = CensusClient()
+    url = c._build_params("Mexico", "08", "imports", date="2013-01",
+                          fields=["country_code", "product_code", "import_value"],
+                          predicates={"COMM_LVL": "HS4", "DISTRICT": ["13", "20"]})
+    _, qs = _parse(url)
+
+    assert qs["get"] == ["CTY_CODE,I_COMMODITY,GEN_VAL_MO"]
+    assert qs["COMM_LVL"] == ["HS4"]
+    assert qs["DISTRICT"] == ["13", "20"]
+
+    with pytest.raises(ValueError):
+        c._build_params("Mexico", "08", "imports", date="2013-01", fields=["export_value"])
+    with pytest.raises(ValueError):
+        c._build_params("Mexico", "08", "imports", date="2013-01", predicates={"CTY_CODE": "1220"})
@@ -0,0 +1,89 @@
+import pandas as pd
+import pytest
+
+from ustrade.client import CensusClient
+from ustrade.concordance import Concordance, version_of
+from ustrade.errors import MissingConcordanceError
+
+
+# 111111 is split in two by HS2022, 222221 and 222222 are merged by HS2017
+LINKS = [
+    {"from_version": "HS2017", "from_code": "111111", "to_version": "HS2022", "to_code": "111112", "weight": 0.75},
+    {"from_version": "HS2017", "from_code": "111111", "to_version": "HS2022", "to_code": "111113", "weight": 0.25},
+    {"from_version": "HS2012", "from_code": "222221", "to_version": "HS2017", "to_code": "222220", "weight": 1.0},
+    {"from_version": "HS2012", "from_code": "222222", "to_version": "HS2017", "to_code": "222220", "weight": 1.0},
+]
+
+
+def test_version_of_dates():
+    dates = pd.to_datetime(["2010-05-01", "2012-01-01", "2021-12-01", "2024-03-01"])
+    assert list(version_of(dates)) == ["HS2007", "HS2012", "HS2017", "HS2022"]
+
+
+def test_translate_codes_across_revisions():
+    conc = Concordance(LINKS)
+    codes = pd.Series(["111111", "222221", "333333", "111111"])
+
+    res = conc.translate(codes, "HS2012", "HS2022")
+    assert res.tolist() == ["111112", "222220", "333333", "111112"]
+
+    compact = conc.translate(codes.astype("category"), "HS2012", "HS2022")
+    assert compact.tolist() == ["111112", "222220", "333333", "111112"]
+    assert compact.cat.categories.tolist() == ["111112", "222220", "333333"]
+
+    back = conc.translate(pd.Series(["222220"]), "HS2017", "HS2012")
+    assert back.iloc[0] in ("222221", "222222")
+
+
+def test_inverted_merge_splits_evenly():
+    links = Concordance(LINKS).links(["222220"], "HS2017", "HS2012")
+    assert sorted(links["to_code"]) == ["222221", "222222"]
+    assert links["weight"].tolist() == [0.5, 0.5]
+
+
+def test_unknown_version_raises():
+    with pytest.raises(ValueError):
+        Concordance(LINKS).translate(pd.Series(["01"]), "HS1996", "HS2022")
+
+
+def test_missing_revision_raises():
+    with pytest.raises(MissingConcordanceError):
+        Concordance(LINKS).translate(pd.Series(["111111"]), "HS2007", "HS2012")
+
+    df = pd.DataFrame({"product_code": ["111111"], "import_value": [1.0], "date": pd.to_datetime(["2021-01-01"])})
+    with pytest.raises(MissingConcordanceError):
+        Concordance([]).harmonize(df, "HS2022")
+    assert Concordance([]).harmonize(df, "HS2017") is df
+
+
+def test_harmonize_reallocates_values():
+    df = pd.DataFrame({
+        "country_code": "5700",
+        "product_code": ["111111", "222221", "222222", "111112"],
+        "import_value": [100.0, 10.0, 5.0, 40.0],
+        "date": pd.to_datetime(["2021-01-01", "2013-01-01", "2013-01-01", "2022-01-01"]),
+    })
+    res = Concordance(LINKS).harmonize(df, "HS2022")
+
+    values = res.set_index(["date", "product_code"])["import_value"]
+    assert values[(pd.Timestamp("2021-01-01"), "111112")] == 75.0
+    assert values[(pd.Timestamp("2021-01-01"), "111113")] == 25.0
+    assert values[(pd.Timestamp("2013-01-01"), "222220")] == 15.0
+    assert values[(pd.Timestamp("2022-01-01"), "111112")] == 40.0
+    assert res["import_value"].sum() == df["import_value"].sum()
+
+
+def test_period_query_harmonize(api):
+    api.payload = [
+        ["CTY_CODE", "CTY_NAME", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "time"],
+        ["5700", "CHINA", "111111", "Widgets", "100", "100", "2021-12"],
+        ["5700", "CHINA", "111112", "Widgets, small", "30", "30", "2022-01"],
+    ]
+    c = CensusClient()
+    c.concordance = Concordance(LINKS)
+
+    df = c.get_imports_on_period("China", "111111", "2021-12", "2022-01", harmonize="HS2022")
+    assert df["product_code"].tolist() == ["111112", "111113", "111112"]
+    assert df["import_value"].tolist() == [75.0, 25.0, 30.0]
+    # the reallocated rows do not keep the description of the former code
+    assert df["product_name"].isna().tolist() == [True, True, False]
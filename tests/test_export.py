@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+
+from ustrade.client import CensusClient
+from ustrade.export import write_partitioned
+
+
+def test_write_partitioned_uses_hive_folders(tmp_path):
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01", "2021-01-01"]),
+        "country_code": ["4279", "4279"],
+        "export_value": [1.0, 2.0],
+    })
+    files = write_partitioned(df, str(tmp_path), part="part-0", flux="exports", format="csv",
+                              partition_by=["year", "flux"])
+
+    assert sorted(os.path.relpath(f, tmp_path) for f in files) == [
+        os.path.join("year=2020", "flux=exports", "part-0.csv"),
+        os.path.join("year=2021", "flux=exports", "part-0.csv"),
+    ]
+
+
+def test_export_on_period_writes_every_shard_atomically(api, tmp_path):
+    target = tmp_path / "dataset"
+    c = CensusClient()
+    c.export_on_period("France", "27", "2019-07", "2021-06", str(target), flux="exports",
+                       format="csv", partition_by=["year"], months_per_shard=6)
+
+    assert sorted(os.listdir(target)) == ["year=2019", "year=2020", "year=2021"]
+    assert os.listdir(tmp_path) == ["dataset"]
+
+    total = sum(len(pd.read_csv(os.path.join(root, f)))
+                for root, _, files in os.walk(target) for f in files)
+    assert total == 24
+
+    with pytest.raises(FileExistsError):
+        c.export_on_period("France", "27", "2019-07", "2021-06", str(target), flux="exports", format="csv")
+
+
+def test_write_partitioned_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01", "2020-02-01", "2021-01-01"]),
+        "country_code": pd.Categorical(["4279", "2010", "4279"]),
+        "export_value": [1.0, float("nan"), 3.0],
+    })
+    write_partitioned(df, str(tmp_path), part="part-0", flux="exports", format="parquet", partition_by=["year"])
+
+    back = pd.read_parquet(tmp_path / "year=2020" / "part-0.parquet")
+    pd.testing.assert_frame_equal(back, df.iloc[:2])
+    dataset = pd.read_parquet(tmp_path)
+    assert sorted(dataset["year"].astype(int).unique()) == [2020, 2021]
+    assert len(dataset) == 3
+
+
+def test_write_partitioned_keeps_rows_with_missing_partition_value(tmp_path):
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01", "2020-01-01"]),
+        "state_code": ["TX", None],
+        "export_value": [1.0, 2.0],
+    })
+    files = write_partitioned(df, str(tmp_path), part="part-0", flux="exports", format="csv",
+                              partition_by=["state_code"])
+
+    assert sorted(os.path.relpath(f, tmp_path) for f in files) == [
+        os.path.join("state_code=TX", "part-0.csv"),
+        os.path.join("state_code=__HIVE_DEFAULT_PARTITION__", "part-0.csv"),
+    ]
@@ -65,3 +65,26 @@ def test_search_for_code_scoped_and_and_mode():
     res = c.search_for_code(["durum", "wheat"], mode="AND", in_codes="1001")
     assert "100111" in set(res["Code"])
 
+
+
+def test_find_codes_by_section_level_and_prefix():
+    c = CensusClient()
+
+    chapters = c.find_codes(section="XV", level=2)
+    assert [p.hscode for p in chapters] == [p.hscode for p in c.find_codes(section=15, level=2)]
+    assert "72" in [p.hscode for p in chapters]
+    assert all(p.section == "XV" for p in chapters)
+
+    headings = c.find_codes(prefix="72", level=4)
+    assert headings and all(p.hscode.startswith("72") and p.level == 4 for p in headings)
+    assert [p.hscode for p in headings] == sorted(c.get_children_codes("72", return_names=False))
+
+    expected = sorted(code for code in c._codes_by_hs_codes if code.startswith("7202"))
+    assert [p.hscode for p in c.find_codes(prefix="7202")] == expected
+
+
+def test_find_codes_as_frame():
+    df = ut.find_codes(prefix="1001", as_frame=True)
+    assert list(df.columns) == ["section", "hscode", "description", "parent", "level"]
+    assert df["hscode"].iloc[0] == "1001"
+    assert ut.find_codes(prefix="0000") == []
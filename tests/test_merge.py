@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from ustrade.merge import merge_sorted
+
+
+def _shard(dates, cty, start_value):
+    dates = pd.to_datetime(dates)
+    return pd.DataFrame({
+        "date": dates,
+        "country_code": pd.array([cty] * len(dates), dtype="str"),
+        "import_value": np.arange(start_value, start_value + len(dates), dtype=float),
+        "compact": pd.Categorical([cty] * len(dates), categories=["2010", "4279"]),
+    })
+
+
+def test_merge_matches_stable_sort_of_concat():
+    a = _shard(["2020-01-01", "2020-03-01", "2020-05-01"], "4279", 0)
+    b = _shard(["2020-02-01", "2020-03-01", "2020-04-01"], "2010", 10)
+
+    res = merge_sorted([a, b])
+    expected = (pd.concat([a, b], ignore_index=True)
+                .sort_values("date", kind="stable").reset_index(drop=True))
+    pd.testing.assert_frame_equal(res, expected)
+
+
+def test_consecutive_shards_are_laid_end_to_end():
+    a = _shard(["2020-01-01", "2020-02-01"], "4279", 0)
+    b = _shard(["2020-02-01", "2020-03-01"], "2010", 10)
+
+    res = merge_sorted([a, b])
+    assert res["import_value"].tolist() == [0.0, 1.0, 10.0, 11.0]
+
+
+def test_merge_without_sort_keeps_shard_order():
+    a = _shard(["2020-03-01"], "4279", 0)
+    b = _shard(["2020-01-01"], "2010", 10)
+
+    res = merge_sorted([a, pd.DataFrame(), b], sort=False)
+    assert res["import_value"].tolist() == [0.0, 10.0]
+
+
+def test_mismatched_columns_fall_back_to_common_dtype():
+    a = _shard(["2020-02-01"], "4279", 0)
+    b = _shard(["2020-01-01"], "2010", 10).drop(columns="compact")
+
+    res = merge_sorted([a, b])
+    assert res["country_code"].tolist() == ["2010", "4279"]
+    assert res["compact"].isna().tolist() == [True, False]
+
+
+def test_categoricals_with_different_categories_stay_categorical():
+    a = _shard(["2020-01-01", "2020-03-01"], "4279", 0)
+    b = _shard(["2020-02-01"], "2010", 10)
+    a["compact"] = pd.Categorical(["4279", None], categories=["4279"])
+    b["compact"] = pd.Categorical(["5700"], categories=["5700", "2010"])
+
+    res = merge_sorted([a, b])
+    assert list(res["compact"].cat.categories) == ["4279", "5700", "2010"]
+    assert res["compact"].tolist()[:2] == ["4279", "5700"] and pd.isna(res["compact"].iloc[2])
+
+
+def test_categoricals_without_categories():
+    a = _shard(["2020-01-01"], "4279", 0)
+    b = _shard(["2020-02-01"], "2010", 10)
+    a["compact"] = b["compact"] = pd.Categorical([None], categories=[])
+
+    res = merge_sorted([a, b])
+    assert isinstance(res["compact"].dtype, pd.CategoricalDtype)
+    assert res["compact"].isna().all()
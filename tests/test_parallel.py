@@ -0,0 +1,224 @@
+import multiprocessing as mp
+import pickle
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+import requests
+
+from conftest import FakeResponse, period_payload
+from ustrade import parallel
+from ustrade.cache import MemoryCache, SQLiteCache
+from ustrade.client import CensusClient
+from ustrade.errors import EmptyResult
+from ustrade.parallel import ProcessExecutor
+from ustrade.sharding import Shard, ShardSizer, plan_shards, replan_shards, split_period, split_shard
+
+
+def test_split_period_covers_range_without_overlap():
+    assert split_period("2019-11", "2021-02", months_per_shard=6) == [
+        ("2019-11", "2020-04"),
+        ("2020-05", "2020-10"),
+        ("2020-11", "2021-02"),
+    ]
+    with pytest.raises(ValueError):
+        split_period("2021-01", "2020-01")
+
+
+def test_plan_shards_splits_countries_and_months():
+    shards = plan_shards(["1220", "4120", "4279"], ["08"], "2020-01", "2021-12",
+                         months_per_shard=12, countries_per_shard=2)
+    assert len(shards) == 4
+    assert shards[0].countries == ("1220", "4120")
+    assert shards[1].countries == ("4279",)
+    assert {(s.start, s.end) for s in shards} == {("2020-01", "2020-12"), ("2021-01", "2021-12")}
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="requires the fork start method")
+def test_process_executor_merges_shards(api):
+    ex = ProcessExecutor(CensusClient(), max_workers=2, months_per_shard=4,
+                         countries_per_shard=1, transport="numpy")
+    df = ex.get_imports_on_period(["France", "Mexico"], "08", "2020-01", "2020-12")
+
+    assert len(df) == 24
+    assert df["date"].is_monotonic_increasing
+    assert set(df["country_code"]) == {"4279", "2010"}
+    assert df["import_value"].sum() == 240.0
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="requires the fork start method")
+def test_process_executor_raises_when_every_shard_is_empty(api):
+    api.payload = requests.exceptions.JSONDecodeError("boom", "", 0)
+    ex = ProcessExecutor(CensusClient(), max_workers=2, transport="numpy")
+    with pytest.raises(EmptyResult):
+        ex.get_exports_on_period("France", "08", "2020-01", "2021-12")
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="requires the fork start method")
+def test_process_executor_collects_worker_spans(api):
+    c = CensusClient(profile=True)
+    ex = ProcessExecutor(c, max_workers=2, months_per_shard=4, transport="numpy")
+    ex.get_imports_on_period("France", "08", "2020-01", "2020-12")
+
+    pool = next(s for s in c.profiler.spans if s.name == "process_pool")
+    roots = [s for s in c.profiler.spans if s.parent_id == pool.span_id]
+    assert [s.name for s in roots] == ["get_flow_on_period"] * 3
+    assert all(s.process_id != pool.process_id for s in roots)
+    assert all(pool.start_ns <= s.start_ns <= s.end_ns <= pool.end_ns for s in roots)
+    assert len({s.span_id for s in c.profiler.spans}) == len(c.profiler.spans)
+
+
+def test_split_shard_halves_months_then_countries():
+    shard = Shard(("4279", "2010"), ("08",), "2020-01", "2020-04")
+    assert [(s.start, s.end) for s in split_shard(shard)] == [("2020-01", "2020-02"), ("2020-03", "2020-04")]
+
+    month = Shard(("4279", "2010"), ("08",), "2020-01", "2020-01")
+    assert [s.countries for s in split_shard(month)] == [("4279",), ("2010",)]
+    assert split_shard(Shard(("4279",), ("08",), "2020-01", "2020-01")) is None
+
+
+def test_shard_sizer_targets_rows_and_latency():
+    sizer = ShardSizer(target_rows=1000, target_seconds=10)
+    assert sizer.months_per_shard("hs", countries=2, products=5) == 12
+
+    # 100 cells returned 1000 rows in 1 second: 10 rows and 0.01 s per cell
+    sizer.observe("hs", cells=100, rows=1000, seconds=1.0)
+    assert sizer.months_per_shard("hs", countries=2, products=5) == 10
+
+    # a timeout of 30 s on 100 cells makes the next shards much smaller
+    sizer.observe_timeout("hs", cells=100, timeout=30)
+    assert sizer.months_per_shard("hs", countries=2, products=5) == 3
+
+
+def test_shard_is_split_on_timeout(api):
+    sent = []
+
+    def answer(url):
+        qs = parse_qs(urlparse(url).query)
+        start, end = qs["time"][0].replace("from ", "").split(" to ")
+        sent.append((start, end))
+        if start != end:
+            raise requests.exceptions.ReadTimeout()
+        return period_payload(url)
+
+    api.payload = answer
+    c = CensusClient(profile=True)
+    df = c._fetch_shard(Shard(("4279",), ("08",), "2020-01", "2020-03"), "imports")
+    assert "split_shard" in [s.name for s in c.profiler.spans]
+
+    assert df["date"].dt.strftime("%Y-%m").tolist() == ["2020-01", "2020-02", "2020-03"]
+    assert ("2020-01", "2020-01") in sent and ("2020-01", "2020-03") in sent
+    assert c.shard_sizer.stats(("imports", "hs"))["seconds_per_cell"] > 0
+
+
+def test_request_time_excludes_json_decoding(monkeypatch):
+    class SlowDecoding(FakeResponse):
+        def json(self):
+            time.sleep(0.2)
+            return super().json()
+
+    monkeypatch.setattr(requests, "get", lambda url, timeout: SlowDecoding(url, period_payload(url)))
+    seen = []
+    c = CensusClient()
+    c._fetch_json("https://api.census.gov/x?get=CTY_CODE&CTY_CODE=4279&I_COMMODITY=08&time=from+2020-01+to+2020-01",
+                  observe=lambda data, seconds: seen.append(seconds))
+
+    assert seen[0] < 0.2
+    assert c.transfers[-1].elapsed < 0.2
+
+
+def test_spawned_worker_builds_client_with_parent_settings(monkeypatch, tmp_path):
+    client = CensusClient(timeout=5, compact=True, drop_descriptions=True, sort_results=False,
+                          validate_results=True, release_calendar=True, cache=SQLiteCache(str(tmp_path / "c.db")))
+    monkeypatch.setattr(parallel, "_WORKER_CLIENT", None)
+
+    parallel._init_worker(pickle.loads(pickle.dumps(client._settings())))
+    worker = parallel._WORKER_CLIENT
+
+    assert worker is not client
+    assert worker._settings().keys() == client._settings().keys()
+    for name, value in client._settings().items():
+        if name != "cache":
+            assert worker._settings()[name] == value
+    assert isinstance(worker.cache, SQLiteCache) and worker.cache.path == client.cache.path
+
+
+def test_arrow_transport_round_trip():
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01", "2020-02-01"]),
+        "country_code": pd.Categorical(["4279", "2010"]),
+        "product_code": ["08", "08"],
+        "import_value": [10.0, float("nan")],
+    })
+
+    pd.testing.assert_frame_equal(parallel._decode(parallel._encode(df, "arrow"), "arrow"), df)
+
+
+def test_numpy_transport_keeps_categoricals():
+    df = pd.DataFrame({
+        "country_code": pd.Categorical(["4279", "2010", "4279"]),
+        "product_code": ["08", "08", "09"],
+        "import_value": [10.0, float("nan"), 5.0],
+    })
+    payload = parallel._encode(df, "numpy")
+    assert payload["country_code"][0].dtype.itemsize == 1
+
+    pd.testing.assert_frame_equal(parallel._decode(payload, "numpy"), df)
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="requires the fork start method")
+def test_process_executor_arrow_transport(api):
+    pytest.importorskip("pyarrow")
+    ex = ProcessExecutor(CensusClient(compact=True), max_workers=2, months_per_shard=6, transport="arrow")
+    df = ex.get_imports_on_period("France", "08", "2020-01", "2020-12")
+
+    assert len(df) == 12
+    assert isinstance(df["country_code"].dtype, pd.CategoricalDtype)
+    assert df["import_value"].sum() == 120.0
+
+
+def test_replan_keeps_the_first_period_and_resizes_the_rest():
+    shards = plan_shards(["1220", "4120"], ["08"], "2020-01", "2021-12", months_per_shard=6, countries_per_shard=1)
+    rest = replan_shards(shards, shards[0], months_per_shard=12)
+
+    assert rest[0] == Shard(("4120",), ("08",), "2020-01", "2020-06")
+    assert [(s.countries, s.start, s.end) for s in rest[1:]] == [
+        (("1220",), "2020-07", "2021-06"), (("4120",), "2020-07", "2021-06"),
+        (("1220",), "2021-07", "2021-12"), (("4120",), "2021-07", "2021-12"),
+    ]
+
+
+def test_cached_responses_are_not_timed(api):
+    c = CensusClient(cache=MemoryCache())
+    c.get_imports_on_period("France", "08", "2020-01", "2020-03")
+    assert c.shard_sizer.stats(("imports", "hs")) is not None
+
+    c.shard_sizer = ShardSizer()
+    c.get_imports_on_period("France", "08", "2020-01", "2020-03")
+    assert len(api.calls) == 1
+    assert c.shard_sizer.stats(("imports", "hs")) is None
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="requires the fork start method")
+def test_process_executor_probes_before_sizing_auto_shards(api):
+    c = CensusClient()
+    ex = ProcessExecutor(c, max_workers=2, months_per_shard="auto", transport="numpy")
+    df = ex.get_imports_on_period("France", "08", "2015-01", "2020-12")
+
+    # only the first shard is fetched by the parent process, the workers fetch the others
+    assert len(api.calls) == 1 and "time=from+2015-01+to+2015-12" in api.calls[0]
+    assert len(df) == 72 and df["date"].is_monotonic_increasing
+    assert c.shard_sizer.stats(("imports", "hs")) is not None
+
+
+def test_shard_sizer_replays_a_journal():
+    worker = ShardSizer()
+    worker.journal = []
+    worker.observe("hs", cells=100, rows=1000, seconds=1.0)
+    worker.observe_timeout("hs", cells=100, timeout=30)
+
+    parent = ShardSizer()
+    parent.replay(worker.journal)
+    assert parent.stats("hs") == worker.stats("hs")
@@ -0,0 +1,63 @@
+import pytest
+
+from ustrade.cache import MemoryCache
+from ustrade.client import CensusClient
+from ustrade.prefetch import Query
+
+
+def _answer(url):
+    if "get=CTY_CODE&" in url:
+        # release probe
+        return [["CTY_CODE", "time"], ["1220", "2025-01"], ["1220", "2025-02"]]
+    return [
+        ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "YEAR", "MONTH"],
+        ["4279", "FRANCE", "10", "Cereals", "10", "2025", "01"],
+    ]
+
+
+def test_prefetch_requires_a_cache():
+    with pytest.raises(ValueError):
+        CensusClient().enable_prefetch()
+
+
+def test_follow_up_queries_are_served_from_cache(api):
+    api.payload = _answer
+
+    c = CensusClient(cache=MemoryCache())
+    prefetcher = c.enable_prefetch(max_concurrent=1)
+    c.get_exports("France", "10", "2025-01")
+    assert prefetcher.wait(timeout=5)
+    assert prefetcher.fetched == 2
+
+    prefetcher.close()
+    c.prefetcher = None
+
+    sent = len(api.calls)
+    c.get_exports("France", c.get_children_codes("10", return_names=False), "2025-01")
+    c.get_exports("France", "10", "2025-02")
+    assert len(api.calls) == sent
+
+
+def test_unreleased_month_is_not_prefetched(api):
+    api.payload = _answer
+
+    c = CensusClient(cache=MemoryCache())
+    prefetcher = c.enable_prefetch(children=False)
+    c.get_exports("France", "10", "2025-02")
+    assert prefetcher.wait(timeout=5)
+    assert prefetcher.fetched == 0
+    assert not any("MONTH=03" in url for url in api.calls)
+    prefetcher.close()
+
+
+def test_only_the_latest_release_is_predicted(api):
+    api.payload = _answer
+
+    c = CensusClient(cache=MemoryCache())
+    prefetcher = c.enable_prefetch(children=False)
+    period = Query("exports", ("4279",), ("10",), start="2024-01", end="2025-01")
+    assert prefetcher.predict(period) == [Query("exports", ("4279",), ("10",), date="2025-02")]
+
+    # 2024-07 was released months ago: it is not a likely follow-up of a query on 2024-06
+    assert prefetcher.predict(Query("exports", ("4279",), ("10",), date="2024-06")) == []
+    prefetcher.close()
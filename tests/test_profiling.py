@@ -0,0 +1,41 @@
+import json
+
+from ustrade.client import CensusClient
+from ustrade.profiling import Profiler
+
+
+def test_profiler_nests_spans_and_summarizes():
+    p = Profiler()
+    with p.span("outer"):
+        with p.span("inner", rows=3):
+            pass
+
+    outer, inner = p.spans
+    assert inner.parent_id == outer.span_id
+    assert set(p.summary()["stage"]) == {"outer", "inner"}
+
+    trace = p.to_chrome_trace()["traceEvents"]
+    assert [e["name"] for e in trace] == ["outer", "inner"]
+    assert trace[1]["args"] == {"rows": "3"}
+
+    spans = p.to_otel()
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert spans[0]["endTimeUnixNano"] >= spans[0]["startTimeUnixNano"]
+
+
+def test_client_records_query_stages(api, tmp_path):
+    c = CensusClient(profile=True)
+    c.get_exports_on_period("Mexico", "27", "2010-01", "2010-02")
+
+    names = [s.name for s in c.profiler.spans]
+    assert names[0] == "get_flow_on_period"
+    for stage in ["build_params", "http_request", "json_decode", "dataframe", "prepare", "apply_types", "sort"]:
+        assert stage in names
+    root = c.profiler.spans[0].span_id
+    assert all(s.parent_id is not None for s in c.profiler.spans if s.span_id != root)
+
+    path = tmp_path / "trace.json"
+    c.profiler.save_chrome_trace(str(path))
+    assert len(json.loads(path.read_text())["traceEvents"]) == len(names)
+
+    assert CensusClient().profiler is None
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ustrade as ut
+from ustrade.client import CensusClient
+from ustrade.result import TradeResult
+
+
+PERIOD = [
+    ["CTY_CODE", "CTY_NAME", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "time"],
+    ["4279", "FRANCE", "08", "Fruit", "10", "9", "2020-02"],
+    ["4279", "FRANCE", "09", "Coffee", "(D)", "(D)", "2020-01"],
+    ["2010", "MEXICO", "08", "Fruit", "5", "4", "2020-01"],
+]
+
+
+@pytest.fixture
+def client(api):
+    api.payload = PERIOD
+    return CensusClient()
+
+
+def test_lazy_result_aggregates_without_dataframe(client):
+    res = client.get_imports_on_period(["France", "MX"], ["08", "09"], "2020-01", "2020-02", lazy=True)
+
+    assert isinstance(res, TradeResult)
+    assert len(res) == 3
+    assert res.total() == 15.0
+    assert res.total("consumption_import_value") == 13.0
+    assert res.by_country() == {"2010": 5.0, "4279": 10.0}
+    assert res.by_product() == {"08": 15.0, "09": 0.0}
+    assert res.by_month() == {"2020-01": 5.0, "2020-02": 10.0}
+    assert np.isnan(res.values()[1])
+    assert res._frame is None
+
+
+def test_to_pandas_matches_eager_query(client):
+    res = client.get_imports_on_period(["France", "MX"], ["08", "09"], "2020-01", "2020-02", lazy=True)
+    df = client.get_imports_on_period(["France", "MX"], ["08", "09"], "2020-01", "2020-02")
+
+    pd.testing.assert_frame_equal(res.to_pandas(), df)
+    assert res.to_pandas() is res.to_pandas()
+
+
+def test_lazy_single_month(api):
+    api.payload = [
+        ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "YEAR", "MONTH"],
+        ["2010", "MEXICO", "27", "Mineral fuels", "10", "2020", "01"],
+    ]
+    ut._default_client = None
+    res = ut.get_exports("Mexico", "27", "2020-01", lazy=True)
+
+    assert res.total() == 10.0
+    assert res.by_month() == {"2020-01": 10.0}
+    assert res.to_pandas()["export_value"].tolist() == [10.0]
+    ut._default_client = None
+
+    with pytest.raises(ValueError):
+        CensusClient().get_exports("Mexico", "27", ["2020-01", "2020-02"], lazy=True)
+
+
+def test_unpublished_month_gives_an_empty_result(api):
+    api.payload = [["CTY_CODE", "time"], ["1220", "2020-01"]]
+    c = CensusClient(release_calendar=True)
+    res = c.get_exports("Mexico", "27", "2020-02", lazy=True)
+
+    assert isinstance(res, TradeResult) and len(res) == 0
+    assert res.total() == 0.0
+    assert res.by_country() == {} and res.by_month() == {}
+    assert res.to_pandas().empty
+
+
+def test_validating_client_leaves_duplicates_out_of_aggregates(api):
+    api.payload = PERIOD + [PERIOD[1]]
+    c = CensusClient(validate_results=True)
+    res = c.get_imports_on_period(["France", "MX"], ["08", "09"], "2020-01", "2020-02", lazy=True)
+
+    assert len(res) == 3
+    assert res.total() == 15.0
+    assert len(res.to_pandas()) == 3
+    assert c.validation_reports[-1].duplicates == 1
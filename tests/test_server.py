@@ -0,0 +1,57 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ustrade.cache import MemoryCache
+from ustrade.client import CensusClient
+from ustrade.server import TradeServer
+
+
+@pytest.fixture
+def server(api):
+    api.payload = [
+        ["CTY_CODE", "CTY_NAME", "E_COMMODITY", "E_COMMODITY_SDESC", "ALL_VAL_MO", "YEAR", "MONTH"],
+        ["2010", "MEXICO", "27", "Mineral fuels", "10", "2020", "01"],
+    ]
+    srv = TradeServer(("127.0.0.1", 0), CensusClient(cache=MemoryCache()), max_concurrent=2)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    srv.calls = api.calls
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(server, path):
+    host, port = server.server_address[:2]
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=5) as r:
+            return r.status, json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_queries_share_the_server_cache(server):
+    status, rows = _get(server, "/exports?country=Mexico&product=27&date=2020-01")
+    assert status == 200
+    assert rows[0]["country_code"] == "2010" and rows[0]["export_value"] == 10.0
+
+    _get(server, "/exports?country=MX&product=27&date=2020-01")
+    assert len(server.calls) == 1
+
+
+def test_code_endpoints(server):
+    status, product = _get(server, "/codes/1001")
+    assert status == 200 and product["level"] == 4 and "100111" in product["children"]
+
+    status, rows = _get(server, "/codes?prefix=72&level=4")
+    assert status == 200 and all(r["hscode"].startswith("72") for r in rows)
+
+
+def test_errors_are_reported(server):
+    assert _get(server, "/exports?product=27&date=2020-01")[0] == 400
+    assert _get(server, "/codes/0000")[0] == 400
+    assert _get(server, "/unknown")[0] == 404
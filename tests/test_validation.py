@@ -0,0 +1,76 @@
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from conftest import period_payload
+from ustrade.client import CensusClient
+from ustrade.validation import check_hierarchy, validate
+
+
+def _result():
+    return pd.DataFrame({
+        "date": pd.to_datetime(["2020-01-01"] * 5),
+        "country_code": "4279",
+        "product_code": ["10", "1001", "1002", "1002", "27"],
+        "import_value": [100.0, 60.0, 30.0, 40.0, np.nan],
+    })
+
+
+def test_validate_dedups_and_flags_missing_values():
+    clean, report = validate(_result(), hierarchy=False)
+
+    assert report.rows == 5
+    assert report.duplicates == 1
+    # the last duplicate is kept
+    assert clean.loc[clean["product_code"] == "1002", "import_value"].tolist() == [40.0]
+    assert report.missing == 1
+    assert clean["suppressed"].tolist() == [False, False, False, True]
+    assert not report.ok
+
+
+def test_children_sum_checked_against_parent():
+    clean, report = validate(_result())
+    assert report.mismatches.empty  # 60 + 40 == 100
+
+    df = _result().drop_duplicates(subset=["product_code"], keep="first")
+    mismatches = check_hierarchy(df)
+    assert mismatches[["product_code", "parent_value", "children_sum"]].values.tolist() == [["10", 100.0, 90.0]]
+
+    # with the expected number of children, incomplete families are not compared
+    assert check_hierarchy(df, children_count={"10": 3}).empty
+
+
+def test_client_validates_results(api):
+    api.payload = [
+        ["CTY_CODE", "CTY_NAME", "I_COMMODITY", "I_COMMODITY_SDESC", "GEN_VAL_MO", "CON_VAL_MO", "time"],
+        ["4279", "FRANCE", "1001", "Wheat", "10", "10", "2020-01"],
+        ["4279", "FRANCE", "1001", "Wheat", "10", "10", "2020-01"],
+        ["4279", "FRANCE", "1002", "Rye", "(D)", "(D)", "2020-01"],
+    ]
+    c = CensusClient(validate_results=True)
+    df = c.get_imports_on_period("France", ["1001", "1002"], "2020-01", "2020-01")
+
+    assert len(df) == 2
+    assert df["suppressed"].tolist() == [False, True]
+    assert c.validation_reports[-1].duplicates == 1
+
+
+def test_projection_without_country_keeps_every_country(api):
+    def answer(url):
+        # the API only returns the variables of `get`: the rows of each country look the same
+        columns = parse_qs(urlparse(url).query)["get"][0].split(",")
+        payload = period_payload(url)
+        keep = [payload[0].index(c) for c in columns + ["time"]]
+        return [[row[i] for i in keep] for row in payload]
+
+    api.payload = answer
+    c = CensusClient(validate_results=True)
+    args = (["FR", "DE", "GB"], "08", "2020-01", "2020-03")
+
+    df = c.get_imports_on_period(*args, fields=["product_code", "import_value"])
+    assert len(df) == 9
+    assert df["import_value"].sum() == 90
+
+    lazy = c.get_imports_on_period(*args, fields=["product_code", "import_value"], lazy=True)
+    assert lazy.total("import_value") == 90
@@ -2,6 +2,10 @@ import pandas as pd
 from .countries import Country
 from .client import CensusClient
 from .codes import HSCode
+from .parallel import ProcessExecutor
+from .cache import CacheBackend, MemoryCache, SQLiteCache, FileCache, RedisCache
+from .concordance import Concordance, translate_codes
+from .result import TradeResult
 from .errors import *
 
 from importlib import metadata
@@ -21,35 +25,51 @@ def _get_default_client() -> CensusClient:
         _default_client = CensusClient()
     return _default_client
 
-def get_imports(country : str| Country | list[str | Country], product : str|list[str], date : str)-> pd.DataFrame:
+def get_imports(country : str| Country | list[str | Country], product : str|list[str], date : str | list[str] | pd.PeriodIndex, dataset : str = "hs",
+                fields : list[str] = None, predicates : dict = None, lazy : bool = False)-> pd.DataFrame | TradeResult:
     """
     Returns the import value from the US to the specified country of the product for the month
     Args:
         country (str | Country | list[str | Country]) : can be the ISO2 code, the full name, the Census Bureau code for this country, or a Country object
-        product (str | list[str]) : HS code
-        date (str): the month, in format 'YYYY-MM'
+        product (str | list[str]) : HS code, or the product code of the dataset
+        date (str | list[str] | pd.PeriodIndex): the month, in format 'YYYY-MM', or several months
+        dataset (str): the endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+        fields (list[str]): the result columns to request (ex: ["country_code", "product_code", "import_value"]). Default None requests every column.
+        predicates (dict): extra API filters added to the query (ex: {"COMM_LVL": "HS4"}).
+        lazy (bool): returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when `to_pandas()` is called. Default uses False.
 
     Examples:
     >>> ut.get_imports(["France", "GB"], ["12", "13"], "2018-03")
     >>> ut.get_imports("GB", "12", "2018-03")
+    >>> ut.get_imports("GB", "12", ["2016-12", "2017-12", "2018-12"])
     """
-    return _get_default_client().get_imports(country = country, product= product, date = date)
+    return _get_default_client().get_imports(country = country, product= product, date = date, dataset = dataset,
+                                          fields = fields, predicates = predicates, lazy = lazy)
 
-def get_exports(country : str| Country | list[str | Country], product : str|list[str], date : str)-> pd.DataFrame:
+def get_exports(country : str| Country | list[str | Country], product : str|list[str], date : str | list[str] | pd.PeriodIndex, dataset : str = "hs",
+                fields : list[str] = None, predicates : dict = None, lazy : bool = False)-> pd.DataFrame | TradeResult:
     """
     Returns the export value from the US to the specified country of the product for the month
     
     Args:
         country (str | Country | list[str | Country]) : can be the ISO2 code, the full name, the Census Bureau code for this country, or a Country object
-        product (str | list[str]) : HS code
-        date (str): the date, in format 'YYYY-MM'
+        product (str | list[str]) : HS code, or the product code of the dataset
+        date (str | list[str] | pd.PeriodIndex): the date, in format 'YYYY-MM', or several months
+        dataset (str): the endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+        fields (list[str]): the result columns to request (ex: ["country_code", "product_code", "import_value"]). Default None requests every column.
+        predicates (dict): extra API filters added to the query (ex: {"COMM_LVL": "HS4"}).
+        lazy (bool): returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when `to_pandas()` is called. Default uses False.
     Examples:
     >>> ut.get_exports(["France", "GB"], ["08", "09"], "2018-03")
     >>> ut.get_exports("GB", "08", "2018-03")
+    >>> ut.get_exports("GB", "08", pd.period_range("2018-01", "2018-06", freq="M"))
     """
-    return _get_default_client().get_exports(country = country, product= product, date = date)
+    return _get_default_client().get_exports(country = country, product= product, date = date, dataset = dataset,
+                                          fields = fields, predicates = predicates, lazy = lazy)
 
-def get_imports_on_period(country : str| Country | list[str | Country], product : str|list[str], start: str, end: str)->pd.DataFrame:
+def get_imports_on_period(country : str| Country | list[str | Country], product : str|list[str], start: str, end: str, dataset : str = "hs",
+                          fields : list[str] = None, predicates : dict = None, harmonize : str = None,
+                          lazy : bool = False)->pd.DataFrame | TradeResult:
     """
     Return the imports on the specified period
 
@@ -62,6 +82,19 @@ def get_imports_on_period(country : str| Country | list[str | Country], product
             Starting date in format "YYYY-MM".
         end (str):
             Ending date in format "YYYY-MM".
+        dataset (str):
+            The endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+        fields (list[str]):
+            The result columns to request (ex: ["country_code", "product_code", "import_value"]).
+            Default None requests every column.
+        predicates (dict):
+            Extra API filters added to the query (ex: {"COMM_LVL": "HS4", "DISTRICT": "13"}).
+        harmonize (str):
+            HS revision in which to express the whole period (ex: "HS2022"): values of codes split or
+            merged by a revision are reallocated. Default None keeps the codes as reported.
+        lazy (bool):
+            Returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when
+            `to_pandas()` is called. Default uses False.
 
     Examples:
         >>> ut.get_imports_on_period(["France", "DE", "GB"], ["09", "08", "07"], "2016-01", "2018-01")
@@ -74,10 +107,13 @@ def get_imports_on_period(country : str| Country | list[str | Country], product
         - Consider increasing `timeout`.
         - Data is only available from 2010-01.
     """
-    return _get_default_client().get_imports_on_period(country, product, start, end)
+    return _get_default_client().get_imports_on_period(country, product, start, end, dataset=dataset,
+                                                        fields=fields, predicates=predicates, harmonize=harmonize, lazy=lazy)
 
 
-def get_exports_on_period(country : str| Country | list[str | Country], product : str|list[str], start: str, end: str)->pd.DataFrame:
+def get_exports_on_period(country : str| Country | list[str | Country], product : str|list[str], start: str, end: str, dataset : str = "hs",
+                          fields : list[str] = None, predicates : dict = None, harmonize : str = None,
+                          lazy : bool = False)->pd.DataFrame | TradeResult:
     """
     Return the exports on the specified period.
 
@@ -90,6 +126,19 @@ def get_exports_on_period(country : str| Country | list[str | Country], product
             Start date in format "YYYY-MM".
         end (str):
             End date in format "YYYY-MM".
+        dataset (str):
+            The endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+        fields (list[str]):
+            The result columns to request (ex: ["country_code", "product_code", "import_value"]).
+            Default None requests every column.
+        predicates (dict):
+            Extra API filters added to the query (ex: {"COMM_LVL": "HS4", "DISTRICT": "13"}).
+        harmonize (str):
+            HS revision in which to express the whole period (ex: "HS2022"): values of codes split or
+            merged by a revision are reallocated. Default None keeps the codes as reported.
+        lazy (bool):
+            Returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when
+            `to_pandas()` is called. Default uses False.
 
     Examples:
         >>> ut.get_exports_on_period(["France", "DE", "GB"], ["09", "08", "07"], "2016-01", "2018-01")
@@ -102,7 +151,42 @@ def get_exports_on_period(country : str| Country | list[str | Country], product
         - Consider increasing `timeout`.
         - Data is only available from 2010-01.
     """
-    return _get_default_client().get_exports_on_period(country, product, start, end)
+    return _get_default_client().get_exports_on_period(country, product, start, end, dataset=dataset,
+                                                        fields=fields, predicates=predicates, harmonize=harmonize, lazy=lazy)
+
+def update(df: pd.DataFrame, flux: Literal["imports", "exports"] = None, end: str = None, revision_months: int = 2, dataset: str = "hs")-> pd.DataFrame:
+    """
+    Refreshes a result of `get_imports_on_period` or `get_exports_on_period` with the newest months.
+
+    Only the months after the latest date held for each country/product are fetched, plus
+    the last `revision_months` months already held, which are replaced by their revised values.
+
+    Args:
+        df (pd.DataFrame):
+            A previous result, with at least the columns "date", "country_code" and "product_code".
+        flux (Literal["imports", "exports"]):
+            The flux of `df`. Default None infers it from the value columns.
+        end (str):
+            Last month to fetch in format "YYYY-MM". Default None uses the current month.
+        revision_months (int):
+            Number of months already held that are fetched again. Default uses 2.
+        dataset (str):
+            The endpoint `df` was fetched from. Default uses "hs".
+
+    Examples:
+        >>> df = ut.get_imports_on_period("Mexico", "08", "2010-01", "2025-01")
+        >>> df = ut.update(df)
+    """
+    return _get_default_client().update(df, flux=flux, end=end, revision_months=revision_months, dataset=dataset)
+
+def with_names(df: pd.DataFrame)-> pd.DataFrame:
+    """
+    Adds the "country_name" and "product_name" columns to a result, from the local country and HS code tables.
+
+    Args:
+        df (pd.DataFrame): a result with the columns "country_code" and/or "product_code"
+    """
+    return _get_default_client().with_names(df)
 
 def get_country_by_name(country: str)-> Country:
     """
@@ -184,14 +268,42 @@ def search_for_code(keyword : str | list[str],
     """
     return _get_default_client().search_for_code(keyword, mode, in_codes)
 
+def find_codes(section: str | int = None, level: int = None, prefix: str = None,
+               as_frame: bool = False) -> list[HSCode] | pd.DataFrame:
+    """
+    Returns the HS codes matching all the given criteria, in code order.
+
+    Args:
+        section (str | int): the HS section, as a roman numeral ("XV") or a number (15).
+        level (int): the number of digits of the codes (2, 4 or 6).
+        prefix (str): the beginning of the codes (ex: "72").
+        as_frame (bool): returns a DataFrame instead of a list of HSCode. Default uses False.
+
+    Examples:
+        >>> ut.find_codes(section="XV", level=2)
+        >>> ut.find_codes(prefix="72", level=4, as_frame=True)
+    """
+    return _get_default_client().find_codes(section=section, level=level, prefix=prefix, as_frame=as_frame)
+
 
 __all__ = [
     "CensusClient",
     "Country",
+    "ProcessExecutor",
+    "CacheBackend",
+    "MemoryCache",
+    "SQLiteCache",
+    "FileCache",
+    "RedisCache",
+    "Concordance",
+    "TradeResult",
     "get_imports",
     "get_exports",
     "get_imports_on_period",
     "get_exports_on_period",
+    "update",
+    "with_names",
+    "translate_codes",
     "get_country_by_name",
     "get_country_by_code",
     "get_country_by_iso2",
@@ -199,4 +311,5 @@ __all__ = [
     "get_children_codes", 
     "get_product",
     "search_for_code",
+    "find_codes",
 ]
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+
+_KEYS = ("country_code", "product_code")
+
+# Month ordinals are packed with the group id in a single int64 sort key.
+_STRIDE = 1 << 24
+
+
+class _SortedPanel:
+    """
+    A value column sorted once by (group, month), on which the metrics are computed with
+    binary searches and cumulative sums instead of per-group loops.
+    """
+
+    def __init__(self, df: pd.DataFrame, value: str, keys):
+        gid = df.groupby(list(keys), sort=False, dropna=False).ngroup().to_numpy(dtype=np.int64)
+        month = (df["date"].dt.year * 12 + df["date"].dt.month - 1).to_numpy(dtype=np.int64)
+
+        key = gid * _STRIDE + month
+        self.order = np.argsort(key, kind="stable")
+        self.key = key[self.order]
+        self.values = df[value].to_numpy(dtype=float)[self.order]
+
+    def lookup(self, months_back: int) -> np.ndarray:
+        target = self.key - months_back
+        pos = np.searchsorted(self.key, target)
+        pos_clipped = np.minimum(pos, len(self.key) - 1)
+        found = (pos < len(self.key)) & (self.key[pos_clipped] == target)
+        return np.where(found, self.values[pos_clipped], np.nan)
+
+    def window_sum(self, window: int) -> tuple[np.ndarray, np.ndarray]:
+        cs = np.cumsum(np.nan_to_num(self.values))
+        held = np.cumsum(~np.isnan(self.values))
+        last_out = np.searchsorted(self.key, self.key - window, side="right") - 1
+        before = np.maximum(last_out, 0)
+        lower = np.where(last_out >= 0, cs[before], 0.0)
+        count = held - np.where(last_out >= 0, held[before], 0)
+        return cs - lower, count
+
+    def scatter(self, sorted_values: np.ndarray) -> np.ndarray:
+        out = np.empty_like(sorted_values)
+        out[self.order] = sorted_values
+        return out
+
+
+def _with_history(df: pd.DataFrame, history: pd.DataFrame | None, months: int) -> tuple[pd.DataFrame, int]:
+    if history is None or history.empty:
+        return df, 0
+    first = df["date"].min() - pd.DateOffset(months=months)
+    history = history[history["date"] >= first]
+    return pd.concat([history, df], ignore_index=True), len(history)
+
+
+def yoy(df: pd.DataFrame, value: str = "import_value", keys=_KEYS, history: pd.DataFrame | None = None) -> pd.Series:
+    """
+    Year-over-year growth of `value` for each country/product and month.
+
+    Args:
+        df (pd.DataFrame): a result with the standard columns ("date", "country_code", "product_code", ...)
+        value (str): the value column. Default uses "import_value".
+        keys (tuple[str]): columns identifying one series. Default uses ("country_code", "product_code").
+        history (pd.DataFrame | None): previously held months, used to compute the growth of the new months in `df` only.
+
+    Returns:
+        pd.Series: the growth rate aligned on `df`, NaN when the same month of the previous year is missing.
+
+    Examples:
+        >>> df["import_yoy"] = yoy(df, "import_value")
+    """
+    full, offset = _with_history(df, history, 12)
+    panel = _SortedPanel(full, value, keys)
+    growth = panel.scatter(panel.values / panel.lookup(12) - 1.0)
+    return pd.Series(growth[offset:], index=df.index, name=f"{value}_yoy")
+
+
+def rolling_sum(df: pd.DataFrame,
+                value: str = "import_value",
+                window: int = 12,
+                min_periods: int | None = None,
+                keys=_KEYS,
+                history: pd.DataFrame | None = None) -> pd.Series:
+    """
+    Sum of `value` over the last `window` calendar months for each country/product.
+
+    Missing months count as zero.
+
+    Args:
+        df (pd.DataFrame): a result with the standard columns
+        value (str): the value column. Default uses "import_value".
+        window (int): number of months of the window. Default uses 12.
+        min_periods (int | None): minimum number of months with a value (not NaN) in the window, NaN otherwise.
+        keys (tuple[str]): columns identifying one series.
+        history (pd.DataFrame | None): previously held months, used to compute the sums of the new months in `df` only.
+
+    Examples:
+        >>> df["import_12m"] = rolling_sum(df, "import_value", window=12)
+    """
+    full, offset = _with_history(df, history, window)
+    panel = _SortedPanel(full, value, keys)
+    total, count = panel.window_sum(window)
+    if min_periods is not None:
+        total = np.where(count >= min_periods, total, np.nan)
+    total = panel.scatter(total)
+    return pd.Series(total[offset:], index=df.index, name=f"{value}_rolling_{window}")
+
+
+def shares(df: pd.DataFrame, value: str = "import_value", by=("date", "product_code")) -> pd.Series:
+    """
+    Share of each row in the total of `value` over the rows sharing the same `by` columns.
+
+    The default returns the partner shares: the part of each country in the flux of a product for the month.
+
+    Examples:
+        >>> df["partner_share"] = shares(df, "export_value")
+    """
+    total = df.groupby(list(by), sort=False, dropna=False)[value].transform("sum")
+    return (df[value] / total).rename(f"{value}_share")
@@ -0,0 +1,355 @@
+import hashlib
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from .errors import CacheError
+
+
+class CacheBackend:
+    """
+    Storage for the API responses of a `CensusClient`.
+
+    Values are bytes, `ttl` is a number of seconds (None keeps the value until it is evicted).
+    `acquire` and `release` implement a lease on a key: the client that gets the lease sends
+    the request while the others wait for the value to appear in the cache. Backends shared
+    between processes make this lease visible to every worker. A lease without `ttl` lasts
+    `LEASE_TTL` seconds, so that a client dying with it does not block the others for ever.
+    """
+
+    def get(self, key: str) -> bytes | None:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float | None = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def acquire(self, key: str, ttl: float | None = None) -> bool:
+        return True
+
+    def release(self, key: str):
+        pass
+
+
+def _expiry(ttl: float | None) -> float | None:
+    return None if ttl is None else time.time() + ttl
+
+
+# seconds a lease lasts when no duration is given
+LEASE_TTL = 60.0
+
+
+def _lease_expiry(ttl: float | None) -> float:
+    return time.time() + (LEASE_TTL if ttl is None else ttl)
+
+
+def _expired(expires: float | None) -> bool:
+    return expires is not None and expires <= time.time()
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache. A pickled copy (ex: sent to a spawned worker process) starts empty.
+
+    Args:
+        maxsize (int): maximum number of responses kept. Default uses 1024.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+        self._leases: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _expired(entry[1]):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, _expiry(ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def acquire(self, key, ttl=None):
+        with self._lock:
+            if key in self._leases and not _expired(self._leases[key]):
+                return False
+            self._leases[key] = _lease_expiry(ttl)
+            return True
+
+    def release(self, key):
+        with self._lock:
+            self._leases.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __reduce__(self):
+        return type(self), (self.maxsize,)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a SQLite database, safe to share between the processes of one host.
+
+    Args:
+        path (str): path of the database file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def __reduce__(self):
+        return type(self), (self.path,)
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or _expired(row[1]):
+            return None
+        return bytes(row[0])
+
+    def set(self, key, value, ttl=None):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, sqlite3.Binary(value), _expiry(ttl)),
+        )
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def acquire(self, key, ttl=None):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires <= ?", (key, time.time()))
+            cursor = conn.execute("INSERT OR IGNORE INTO leases (key, expires) VALUES (?, ?)", (key, _lease_expiry(ttl)))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount == 1
+
+    def release(self, key):
+        self._conn().execute("DELETE FROM leases WHERE key = ?", (key,))
+
+
+class FileCache(CacheBackend):
+    """
+    Cache stored as one file per response in a folder, safe to share between processes.
+
+    Files are written atomically; leases are lock files created exclusively.
+
+    Args:
+        directory (str): folder of the cache, created if needed.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + suffix)
+
+    def get(self, key):
+        try:
+            with open(self._path(key, ".bin"), "rb") as f:
+                expires, value = f.read().split(b"\n", 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        if expires and _expired(float(expires)):
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = _expiry(ttl)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(b"" if expires is None else repr(expires).encode())
+            f.write(b"\n")
+            f.write(value)
+        os.replace(tmp, self._path(key, ".bin"))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key, ".bin"))
+        except FileNotFoundError:
+            pass
+
+    def acquire(self, key, ttl=None):
+        path = self._path(key, ".lock")
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(path) as f:
+                        content = f.read()
+                    created = os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                # an empty lock file is being written by its owner - unless the owner died
+                # before writing it: it then expires like a lease taken when it was created
+                expires = float(content) if content else created + (LEASE_TTL if ttl is None else ttl)
+                if not _expired(expires):
+                    return False
+                self.release(key)
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(repr(_lease_expiry(ttl)))
+            return True
+        return False
+
+    def release(self, key):
+        try:
+            os.remove(self._path(key, ".lock"))
+        except FileNotFoundError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache stored in a server speaking the Redis protocol (Redis, Valkey, KeyDB...), shared by every worker.
+
+    Only the GET, SET and DEL commands are used; the leases are keys set with NX.
+
+    Args:
+        host (str): server host. Default uses "localhost".
+        port (int): server port. Default uses 6379.
+        db (int): database index.
+        prefix (str): prefix added to every key.
+        timeout (float): socket timeout in seconds.
+
+    Examples:
+        >>> cache = RedisCache.from_url("redis://cache.internal:6379/0")
+        >>> c = CensusClient(cache=cache)
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0,
+                 prefix: str = "ustrade:", timeout: float = 10):
+        self.host, self.port, self.db = host, port, db
+        self.prefix = prefix
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCache":
+        parsed = urlparse(url)
+        db = int(parsed.path.strip("/") or 0)
+        return cls(host=parsed.hostname or "localhost", port=parsed.port or 6379, db=db, **kwargs)
+
+    def __reduce__(self):
+        return type(self), (self.host, self.port, self.db, self.prefix, self.timeout)
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.db:
+            self._send("SELECT", str(self.db))
+
+    def _close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise CacheError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size == -1:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size == -1 else [self._read_reply() for _ in range(size)]
+        raise CacheError(f"Unexpected reply from the cache server: {line!r}")
+
+    def _command(self, *args):
+        if self._pid != os.getpid():
+            # forked: the socket and the lock (possibly held by a thread of the parent) are the parent's
+            self._sock = self._reader = None
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (ConnectionError, OSError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def get(self, key):
+        return self._command("GET", self.prefix + key)
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            self._command("SET", self.prefix + key, value)
+        else:
+            self._command("SET", self.prefix + key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self._command("DEL", self.prefix + key)
+
+    def acquire(self, key, ttl=None):
+        ttl = LEASE_TTL if ttl is None else ttl
+        reply = self._command("SET", self.prefix + "lease:" + key, b"1", "NX", "PX", max(1, int(ttl * 1000)))
+        return reply == "OK"
+
+    def release(self, key):
+        self._command("DEL", self.prefix + "lease:" + key)
@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .client import CensusClient
+from .cache import MemoryCache, RedisCache, SQLiteCache
+from .errors import EmptyResult, USTradeError
+from .sharding import Shard
+from . import export
+
+
+_CHECKPOINT = "_checkpoint.jsonl"
+
+_DEFAULTS = {
+    "flux": "imports",
+    "dataset": "hs",
+    "format": "parquet",
+    "partition_by": ["year", "flux"],
+    "months_per_shard": 12,
+    "countries_per_shard": None,
+    "workers": 4,
+    "timeout": 120,
+    "cache": None,
+}
+
+
+def _split(value):
+    if value is None or isinstance(value, list):
+        return value
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def _load_spec(args) -> dict:
+    spec = dict(_DEFAULTS)
+    if args.spec:
+        with open(args.spec, encoding="utf-8") as f:
+            spec.update(json.load(f))
+    for key, value in vars(args).items():
+        if key not in ("spec", "command", "func") and value is not None:
+            spec[key] = value
+
+    for key in ("countries", "products", "flux", "partition_by"):
+        spec[key] = _split(spec.get(key))
+    missing = [k for k in ("countries", "products", "start", "end", "output") if not spec.get(k)]
+    if missing:
+        raise SystemExit(f"ustrade extract: missing {', '.join(missing)} (as options or in --spec)")
+    return spec
+
+
+def _expand_products(client: CensusClient, selectors: list[str]) -> list[str]:
+    """
+    'XX*' selects the codes directly under XX in the HS hierarchy
+    """
+    products = []
+    for sel in selectors:
+        if sel.endswith("*"):
+            products.extend(client.get_children_codes(sel[:-1], return_names=False))
+        else:
+            products.append(sel)
+    return products
+
+
+# options that change the content or the layout of the files: a run resumes only with the same values
+_LAYOUT = ("dataset", "format", "partition_by")
+
+
+def _shard_id(flux, dataset, shard) -> str:
+    digest = hashlib.sha1(",".join(shard.countries + ("|",) + shard.products).encode()).hexdigest()[:10]
+    return f"{flux}-{dataset}-{shard.start}-{shard.end}-{digest}"
+
+
+def _read_checkpoint(output: str) -> tuple[dict, set[str]]:
+    """
+    Returns the records describing the run ("layout", "plan") and the ids of the shards already written
+    """
+    path = os.path.join(output, _CHECKPOINT)
+    header, done = {}, set()
+    if not os.path.exists(path):
+        return header, done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "shard" in record:
+                done.add(record["shard"])
+            else:
+                header.update(record)
+    return header, done
+
+
+def _write_checkpoint(output: str, record: dict):
+    with open(os.path.join(output, _CHECKPOINT), "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _check_layout(output: str, spec: dict) -> tuple[dict, set[str]]:
+    """
+    Reads the checkpoint of `output`, after checking its shards were written with the same layout
+    """
+    layout = {key: spec[key] for key in _LAYOUT}
+    header, done = _read_checkpoint(output)
+    previous = header.get("layout")
+    if previous is None:
+        _write_checkpoint(output, {"layout": layout})
+    elif previous != layout:
+        changed = ", ".join(f"{k}: {previous.get(k)!r} -> {layout[k]!r}" for k in _LAYOUT if previous.get(k) != layout[k])
+        raise ValueError(f"{output!r} was extracted with other options ({changed}) - use another output folder")
+    return header, done
+
+
+def _plan(client: CensusClient, spec: dict, products: list[str], output: str, done: set[str], write) -> list[tuple]:
+    plan = []
+    for flux in spec["flux"]:
+        shards = client._plan_period_shards(spec["countries"], products, spec["start"], spec["end"],
+                                            months_per_shard=spec["months_per_shard"],
+                                            countries_per_shard=spec["countries_per_shard"],
+                                            flux=flux, dataset=spec["dataset"])
+        # nothing observed on the endpoint yet: the other shards are sized from a first request
+        probe = (_shard_id(flux, spec["dataset"], shards[0]), flux, shards[0])
+        try:
+            first, shards = client._probe_period_shards(shards, flux, spec["dataset"], spec["months_per_shard"])
+            if first is not None:
+                # planned before being written: a shard that could not be written is fetched again with the others
+                plan.append(probe)
+                _write_checkpoint(output, {"shard": probe[0], "rows": write(probe, first)})
+                done.add(probe[0])
+        except Exception as e:
+            # a failed request leaves the initial plan, first shard included
+            print(f"{flux} {probe[2].start}..{probe[2].end} failed: {e}", file=sys.stderr)
+        plan.extend((_shard_id(flux, spec["dataset"], shard), flux, shard) for shard in shards)
+    return plan
+
+
+def _months(value: str):
+    return value if value == "auto" else int(value)
+
+
+def extract(args) -> int:
+    spec = _load_spec(args)
+    export._check_format(spec["format"])
+
+    cache = SQLiteCache(spec["cache"]) if spec["cache"] else None
+    client = CensusClient(timeout=spec["timeout"], cache=cache, max_workers=spec["workers"])
+    products = _expand_products(client, spec["products"])
+
+    output = spec["output"]
+    os.makedirs(output, exist_ok=True)
+    header, done = _check_layout(output, spec)
+
+    def write(item, df):
+        shard_id, flux, _ = item
+        if df.empty:
+            return 0
+        export.write_partitioned(df, output, part=shard_id, flux=flux, format=spec["format"],
+                                 partition_by=spec["partition_by"])
+        return len(df)
+
+    def run(item):
+        _, flux, shard = item
+        try:
+            # a shard that times out is split and fetched again, still recorded under its own id
+            df = client._fetch_shard(shard, flux, dataset=spec["dataset"])
+        except EmptyResult:
+            return 0
+        return write(item, df)
+
+    # "auto" shards depend on the statistics of the run: their plan is kept so that a resumed run fetches the same ones
+    query = {"flux": spec["flux"], "countries": spec["countries"], "products": products, "start": spec["start"],
+             "end": spec["end"], "countries_per_shard": spec["countries_per_shard"]}
+    if "plan" in header:
+        if header["plan"]["query"] != query:
+            raise ValueError(f"{output!r} was extracted with months_per_shard='auto' for another query - use another output folder")
+        plan = [(shard_id, flux, Shard(tuple(ctys), tuple(prods), start, end))
+                for shard_id, flux, ctys, prods, start, end in header["plan"]["shards"]]
+    else:
+        plan = _plan(client, spec, products, output, done, write)
+        if spec["months_per_shard"] == "auto":
+            _write_checkpoint(output, {"plan": {"query": query, "shards": [
+                [shard_id, flux, list(shard.countries), list(shard.products), shard.start, shard.end]
+                for shard_id, flux, shard in plan
+            ]}})
+
+    todo = [p for p in plan if p[0] not in done]
+    print(f"{len(plan)} shards planned, {len(plan) - len(todo)} already done", file=sys.stderr)
+
+    failed = 0
+    finished = len(plan) - len(todo)
+    with ThreadPoolExecutor(max_workers=spec["workers"]) as pool:
+        futures = {pool.submit(run, item): item for item in todo}
+        for future in as_completed(futures):
+            shard_id, flux, shard = futures[future]
+            finished += 1
+            try:
+                rows = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{finished}/{len(plan)}] {flux} {shard.start}..{shard.end} failed: {e}", file=sys.stderr)
+                continue
+            _write_checkpoint(output, {"shard": shard_id, "rows": rows})
+            print(f"[{finished}/{len(plan)}] {flux} {shard.start}..{shard.end}: {rows} rows", file=sys.stderr)
+
+    if failed:
+        print(f"{failed} shards failed - run the same command again to resume", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _open_cache(spec: str | None):
+    if not spec:
+        return MemoryCache()
+    if spec.startswith("redis://"):
+        return RedisCache.from_url(spec)
+    return SQLiteCache(spec)
+
+
+def serve(args) -> int:
+    from .server import TradeServer
+
+    client = CensusClient(timeout=args.timeout, cache=_open_cache(args.cache), release_calendar=args.release_calendar)
+    server = TradeServer((args.host, args.port), client, max_concurrent=args.max_concurrent, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"ustrade serving on http://{host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="ustrade", description="Bulk extraction from the U.S. Census Bureau International Trade API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ext = commands.add_parser("extract", help="fetch a period in shards and write a partitioned dataset",
+                              description="Fetch a period in shards and write a partitioned dataset. "
+                                          "Completed shards are recorded in the output folder, so an interrupted run "
+                                          "resumes where it stopped when launched again.")
+    ext.add_argument("--spec", help="JSON file with any of the options below (command line options take precedence)")
+    ext.add_argument("--countries", help="comma separated countries (names, ISO2 or Census codes)")
+    ext.add_argument("--products", help="comma separated HS codes; 'XX*' selects the codes directly under XX")
+    ext.add_argument("--flux", help="imports, exports or imports,exports (default: imports)")
+    ext.add_argument("--start", help="first month, YYYY-MM")
+    ext.add_argument("--end", help="last month, YYYY-MM")
+    ext.add_argument("--output", help="output folder")
+    ext.add_argument("--dataset", help="API endpoint: hs, enduse, naics, porths or statehs (default: hs)")
+    ext.add_argument("--format", choices=["parquet", "csv"], help="output format (default: parquet)")
+    ext.add_argument("--partition-by", dest="partition_by", help="comma separated partition columns (default: year,flux)")
+    ext.add_argument("--months-per-shard", dest="months_per_shard", type=_months,
+                     help="months fetched by one request, or 'auto' to size them from the observed rows and latency (default: 12)")
+    ext.add_argument("--countries-per-shard", dest="countries_per_shard", type=int, help="countries fetched by one request (default: all)")
+    ext.add_argument("--workers", type=int, help="concurrent requests (default: 4)")
+    ext.add_argument("--timeout", type=float, help="request timeout in seconds (default: 120)")
+    ext.add_argument("--cache", help="SQLite file used to cache the responses")
+    ext.set_defaults(func=extract)
+
+    srv = commands.add_parser("serve", help="answer queries over local HTTP with one shared client",
+                              description="Answer queries over local HTTP with one shared client: consumers share its "
+                                          "reference data, its response cache and its request coalescing.")
+    srv.add_argument("--host", default="127.0.0.1", help="interface to listen on (default: 127.0.0.1)")
+    srv.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    srv.add_argument("--cache", help="SQLite file or redis:// URL of the response cache (default: in memory)")
+    srv.add_argument("--max-concurrent", dest="max_concurrent", type=int, default=8,
+                     help="queries running at a time, the others wait (default: 8)")
+    srv.add_argument("--timeout", type=float, default=120, help="request timeout in seconds (default: 120)")
+    srv.add_argument("--release-calendar", dest="release_calendar", action="store_true",
+                     help="skip unpublished months and cache past months without expiry")
+    srv.add_argument("--verbose", action="store_true", help="log every request")
+    srv.set_defaults(func=serve)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (USTradeError, ValueError, ImportError) as e:
+        print(f"ustrade: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
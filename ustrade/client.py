@@ -1,34 +1,89 @@
+import hashlib
+import json
+import os
 import requests
+import shutil
 import socket
+import time
 from datetime import datetime
 import pandas as pd
 import re
-from urllib.parse import urlencode
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, quote
 from typing import Literal
 import unicodedata
+from contextlib import nullcontext
 
 from . import countries
 from .countries import Country
 from . import codes
 from .codes import HSCode
+from . import sharding
+from . import export
+from . import datasets
+from . import transport
+from . import validation
+from .transport import TransferStats
+from .cache import CacheBackend, LEASE_TTL
+from .singleflight import SingleFlight
+from .profiling import Profiler
+from .prefetch import Prefetcher, Query
+from .result import TradeResult
+from .merge import merge_sorted
+from .concordance import Concordance, default_concordance
 from .errors import *
 
 class CensusClient:
 
 
-    def __init__(self, timeout=60, retries = 3):
+    def __init__(self, timeout=60, retries = 3, release_calendar = False, release_ttl = 3600, drop_descriptions = False, compact = False,
+                 max_workers = 8, cache: CacheBackend | None = None, cache_ttl = 86400, profile = False,
+                 sort_results = True, validate_results = False, lease_ttl = None):
         self.timeout = timeout
+        self.sort_results = sort_results
+        self.validate_results = validate_results
+        self.validation_reports: deque[validation.ValidationReport] = deque(maxlen=1000)
+        self._children_count = None
         self.retries = retries
+        self.max_workers = max_workers
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        # how long a query stays leased in the cache: a request should not outlive it
+        self.lease_ttl = lease_ttl if lease_ttl is not None else (timeout if timeout is not None else LEASE_TTL)
+        self._CACHE_POLL_INTERVAL = 0.05
+        self._inflight = SingleFlight()
+        self.shard_sizer = sharding.ShardSizer()
+        self.profiler = Profiler() if profile else None
+        self.drop_descriptions = drop_descriptions
+        self.compact = compact
+        self.release_calendar = release_calendar
+        self.release_ttl = release_ttl
+        self._latest_months = {}
+        self._concordance = None
+        self.prefetcher: Prefetcher | None = None
+
+        self.transfers: deque[TransferStats] = deque(maxlen=1000)
+        self.bytes_transferred = 0
+        self.bytes_decoded = 0
+        self._stats_lock = threading.Lock()
         self._country_codes = countries._load_countries()
         self._country_by_code = {c.code: c for c in self._country_codes}
         self._country_by_name = {c.name.lower(): c for c in self._country_codes}
         self._country_by_iso  = {c.iso2.upper(): c for c in self._country_codes}
+        self._country_names = {c.code: c.name for c in self._country_codes}
 
         self.BASE_URL = "api.census.gov"
         self.BASE_PORT = 443
+        # Canada / mineral fuels : reported every month, used to detect the latest release
+        self._RELEASE_PROBE_COUNTRY = "1220"
+        self._RELEASE_PROBE_PRODUCT = "27"
 
         self._hs_codes, self._codes_by_hs_codes, self._desc_by_hs_codes = codes._load_codes()
         self._code_tree = codes.build_tree_from_codes(self._hs_codes)
+        self._hs_index = codes.HSIndex(self._hs_codes)
+        self._product_names = {c.hscode: c.description for c in self._hs_codes}
 
         self.col_mapping = {
             
@@ -42,6 +97,11 @@ class CensusClient:
             "E_ENDUSE_LDESC" : "product_name",
             "I_COMMODITY_SDESC": "product_name",
             "E_COMMODITY_SDESC": "product_name",
+            "NAICS": "product_code",
+            "NAICS_LDESC": "product_name",
+            "PORT": "port_code",
+            "PORT_NAME": "port_name",
+            "STATE": "state_code",
             "GEN_VAL_MO" : "import_value",
             'ALL_VAL_MO': "export_value",
             "CON_VAL_MO": 'consumption_import_value',
@@ -58,13 +118,19 @@ class CensusClient:
             "country": "str",
             "time": "datetime",
             'date': "datetime",
-            "country_code": 'str'
+            "country_code": 'str',
+            "port_code": 'str',
+            "port_name": 'str',
+            "state_code": 'str'
         }
 
 
         self._cols_to_return = ["date",
                                 "country_name",
                                 "country_code", 
+                                "port_code",
+                                "port_name",
+                                "state_code",
                                 "product_name", 
                                 "product_code",
                                 "import_value", 
@@ -72,6 +138,9 @@ class CensusClient:
                                 "consumption_import_value"
                                 ]
 
+        self._compact_cols = ["country_code", "country_name", "port_code", "port_name",
+                              "state_code", "product_code", "product_name"]
+
     def _check_connectivity(self) -> bool:
         """
         Check if connection can be made to the API 
@@ -88,33 +157,45 @@ class CensusClient:
         
                                     ##### DATA RESEARCH FUNCTIONS #######
 
-    def get_imports(self, country : str| Country | list[str | Country], product : str|list[str], date : str)-> pd.DataFrame:
+    def get_imports(self, country : str| Country | list[str | Country], product : str|list[str], date : str | list[str] | pd.PeriodIndex, dataset : str = "hs",
+                    fields : list[str] = None, predicates : dict = None, lazy : bool = False)-> pd.DataFrame | TradeResult:
         """
         Returns the import value from the US to the specified country of the product for the month
         Args:
             country (str | Country | list[str | Country]) : can be the ISO2 code, the full name, the Census Bureau code for this country, or a Country object
-            product (str | list[str]) : HS code
-            date (str): the month, in format 'YYYY-MM'
+            product (str | list[str]) : HS code, or the product code of the dataset
+            date (str | list[str] | pd.PeriodIndex): the month, in format 'YYYY-MM', or several months
+            dataset (str): the endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+            fields (list[str]): the result columns to request (ex: ["country_code", "product_code", "import_value"]). Default None requests every column.
+            predicates (dict): extra API filters added to the query (ex: {"COMM_LVL": "HS4"}).
+            lazy (bool): returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when `to_pandas()` is called. Default uses False.
 
         Examples:
         >>> ut.get_imports(["France", "GB"], ["12", "13"], "2018-03")
         >>> ut.get_imports("GB", "12", "2018-03")
+        >>> ut.get_imports("GB", "12", ["2016-12", "2017-12", "2018-12"])
         """
-        return self._get_flow(country, product, date=date, flux="imports")
+        return self._get_flow(country, product, date=date, flux="imports", dataset=dataset, fields=fields, predicates=predicates, lazy=lazy)
     
-    def get_exports(self, country : str| Country | list[str | Country], product : str|list[str], date : str)-> pd.DataFrame:
+    def get_exports(self, country : str| Country | list[str | Country], product : str|list[str], date : str | list[str] | pd.PeriodIndex, dataset : str = "hs",
+                    fields : list[str] = None, predicates : dict = None, lazy : bool = False)-> pd.DataFrame | TradeResult:
         """
         Returns the export value from the US to the specified country of the product for the month
         
         Args:
             country (str | Country | list[str | Country]) : can be the ISO2 code, the full name, the Census Bureau code for this country, or a Country object
-            product (str | list[str]) : HS code
-            date (str): the date, in format 'YYYY-MM'
+            product (str | list[str]) : HS code, or the product code of the dataset
+            date (str | list[str] | pd.PeriodIndex): the date, in format 'YYYY-MM', or several months
+            dataset (str): the endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+            fields (list[str]): the result columns to request (ex: ["country_code", "product_code", "import_value"]). Default None requests every column.
+            predicates (dict): extra API filters added to the query (ex: {"COMM_LVL": "HS4"}).
+            lazy (bool): returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when `to_pandas()` is called. Default uses False.
         Examples:
         >>> ut.get_exports(["France", "GB"], ["08", "09"], "2018-03")
         >>> ut.get_exports("GB", "08", "2018-03")
+        >>> ut.get_exports("GB", "08", pd.period_range("2018-01", "2018-06", freq="M"))
         """
-        return self._get_flow(country, product, date, "exports")
+        return self._get_flow(country, product, date, "exports", dataset=dataset, fields=fields, predicates=predicates, lazy=lazy)
     
 
     def _build_params(self,
@@ -123,7 +204,10 @@ class CensusClient:
                       flux: str, 
                       date:str = None, 
                       start:str = None, 
-                      end:str= None)->dict:
+                      end:str= None,
+                      dataset:str = "hs",
+                      fields:list[str] = None,
+                      predicates:dict = None)->dict:
         
         if isinstance(country, (str, countries.Country)):
             cty = self._normalize_country(country)
@@ -138,7 +222,9 @@ class CensusClient:
             product = [product]
         
         
-        flux_letter = flux[0].upper()
+        ds = datasets.get_dataset(dataset)
+        if flux not in ("imports", "exports"):
+            raise ValueError(f"Invalid flux: {flux!r}")
 
         if date: 
             dt = datetime.strptime(date, "%Y-%m")
@@ -158,23 +244,28 @@ class CensusClient:
             date_range=True
         
         #Base arguments ####
-        if flux == 'imports':
-            params = {"get": 
-                      f"CTY_CODE,CTY_NAME,{flux_letter}_COMMODITY,{flux_letter}_COMMODITY_SDESC,GEN_VAL_MO,CON_VAL_MO"}
-        
-        if flux == 'exports':
-            params = {'get' : 
-                      f"CTY_CODE,CTY_NAME,{flux_letter}_COMMODITY,{flux_letter}_COMMODITY_SDESC,ALL_VAL_MO"}
+        params = {"get": ",".join(self._select_variables(ds, flux, fields, product))}
 
         query = urlencode(params)
 
-        url = f"https://{self.BASE_URL}/data/timeseries/intltrade/{flux}/hs?{query}"
+        url = f"https://{self.BASE_URL}/data/timeseries/intltrade/{flux}/{ds.name}?{query}"
 
         #Adding countries + codes: ####
-        for c in country:
-            url += f"&CTY_CODE={str(c)}"
-        for k in product:
-            url += f'&{flux_letter}_COMMODITY={str(k)}'
+        # (sorted, so that the same query always gives the same url)
+        product_var = ds.product_var(flux)
+        for c in sorted(set(map(str, country))):
+            url += f"&CTY_CODE={c}"
+        for k in sorted(set(map(str, product))):
+            url += f'&{product_var}={k}'
+
+        #Adding extra predicates: ####
+        for key, values in sorted((predicates or {}).items()):
+            if key in ("CTY_CODE", product_var, "time", "YEAR", "MONTH"):
+                raise ValueError(f"Predicate {key!r} is already set by the query arguments")
+            if isinstance(values, (str, int)):
+                values = [values]
+            for v in values:
+                url += f"&{key}={quote(str(v))}"
 
         ### Adding Time ranges: ###
 
@@ -187,26 +278,109 @@ class CensusClient:
 
 
 
-    def _get_flow(self, country, product, date, flux):
+    def _select_variables(self, ds, flux, fields, product=()):
+        variables = ds.variables(flux)
+        dropped = {}
+        if self.drop_descriptions or self.compact:
+            # the names are resolved locally from the codes (see `_attach_names` and `with_names`)
+            dropped = {"CTY_NAME": "CTY_CODE"}
+            # the local table stops at HS6: longer or unknown codes keep the description of the API
+            if ds.hs_names and all(str(p) in self._product_names for p in product):
+                dropped[ds.product_desc_var(flux)] = ds.product_var(flux)
+        if fields is None:
+            return [v for v in variables if v not in dropped]
+
+        available = {self.col_mapping.get(v, v): v for v in variables}
+        unknown = [f for f in fields if f not in available and f != "date"]
+        if unknown:
+            raise ValueError(
+                f"Unknown fields {unknown!r} for {flux}/{ds.name} - available fields are {sorted(available)!r}"
+            )
+        wanted = {available[f] for f in fields if f != "date"}
+        wanted |= {dropped[v] for v in wanted if v in dropped}
+        selected = [v for v in variables if v in wanted and v not in dropped]
+        if not selected:
+            raise ValueError("`fields` must contain at least one column besides 'date'")
+        return selected
 
-        url = self._build_params(country, product, date= date,flux= flux)
-        
-        response = requests.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        
-        try:
-            data = response.json()
-        except requests.exceptions.JSONDecodeError:
-            return pd.DataFrame()
-        header, rows = data[0], data[1:]
 
-        df = pd.DataFrame(rows, columns=header)
-        
+    def _get_flow(self, country, product, date, flux, dataset="hs", fields=None, predicates=None, lazy=False):
 
-        return (self._prepare_results(df))
+        if not isinstance(date, str):
+            if lazy:
+                raise ValueError("Lazy results are available for a single month or a period, not for a list of months")
+            return self._get_flow_on_dates(country, product, date, flux, dataset=dataset, fields=fields, predicates=predicates)
 
+        if self.release_calendar and not self.is_published(flux, date):
+            if lazy:
+                return TradeResult([], [], self.col_mapping, lambda header, rows: pd.DataFrame())
+            return pd.DataFrame()
 
-    def get_imports_on_period(self, country : str| Country | list[str | Country], product : str|list[str], start: str, end: str)->pd.DataFrame:
+        with self._span("get_flow", flux=flux, date=date):
+            with self._span("build_params"):
+                url = self._build_params(country, product, date= date,flux= flux, dataset=dataset, fields=fields, predicates=predicates)
+
+            def materialize(header, rows):
+                if not header:
+                    return pd.DataFrame()
+                with self._span("dataframe", rows=len(rows)):
+                    df = pd.DataFrame(rows, columns=header)
+                # compact results leave the names to `with_names`, unless `fields` asks for them
+                if self.drop_descriptions and not self.compact or self.compact and fields is not None:
+                    df = self._attach_names(df, dataset, flux, fields)
+                return (self._prepare_results(df, keys=keys))
+
+            keys = self._validation_keys(dataset, flux, fields)
+            if lazy:
+                data, _ = self._inflight.do("raw:" + url, lambda: self._fetch_json(url, ttl=self._cache_ttl(flux, date)))
+                data = data or [[]]
+                return TradeResult(data[0], data[1:], self.col_mapping, materialize,
+                                   dedup=self.validate_results and keys != [])
+
+            def load():
+                data = self._fetch_json(url, ttl=self._cache_ttl(flux, date))
+                if data is None:
+                    return pd.DataFrame()
+                return materialize(data[0], data[1:])
+
+            # Identical queries running at the same time share one request; a shared frame is copied for each caller
+            df, shared = self._inflight.do(url, load)
+            if shared:
+                df = df.copy()
+
+        if not df.empty:
+            self._after_query(country, product, flux, dataset, fields, predicates, date=date)
+        return df
+
+
+    def _get_flow_on_dates(self, country, product, dates, flux, dataset="hs", fields=None, predicates=None):
+        if isinstance(dates, pd.PeriodIndex):
+            dates = dates.strftime("%Y-%m")
+        runs = sharding.coalesce_months(list(dates))
+
+        with self._span("get_flow_on_dates", flux=flux, runs=len(runs)):
+            parent = self.profiler.current() if self.profiler else None
+
+            def fetch(run):
+                try:
+                    with self._span("run", parent=parent, start=run[0], end=run[1]):
+                        return self._get_flow_on_period(country, product, run[0], run[1], flux,
+                                                        dataset=dataset, fields=fields, predicates=predicates)
+                except EmptyResult:
+                    return None
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(runs)))) as pool:
+                frames = [df for df in pool.map(fetch, runs) if df is not None]
+
+        # The runs are disjoint and in chronological order: the shards are laid end to end
+        # each run was already checked against the HS hierarchy: only duplicates across runs remain
+        return self._validated(merge_sorted(frames, sort=self.sort_results), hierarchy=False,
+                               keys=self._validation_keys(dataset, flux, fields))
+
+
+    def get_imports_on_period(self, country : str| Country | list[str | Country], product : str|list[str], start: str, end: str, dataset : str = "hs",
+                              fields : list[str] = None, predicates : dict = None, harmonize : str = None,
+                              lazy : bool = False)->pd.DataFrame | TradeResult:
         """
         Return the imports on the specified period
 
@@ -219,6 +393,20 @@ class CensusClient:
                 Starting date in format "YYYY-MM".
             end (str):
                 Ending date in format "YYYY-MM".
+            dataset (str):
+                The endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+            fields (list[str]):
+                The result columns to request (ex: ["country_code", "product_code", "import_value"]).
+                Default None requests every column.
+            predicates (dict):
+                Extra API filters added to the query (ex: {"COMM_LVL": "HS4", "DISTRICT": "13"}).
+            harmonize (str):
+                HS revision in which to express the whole period (ex: "HS2022"): values of codes split or
+                merged by a revision are reallocated. Needs a concordance table - the packaged one is empty,
+                assign `c.concordance = Concordance.from_csv(path)` first. Default None keeps the codes as reported.
+            lazy (bool):
+                Returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when
+                `to_pandas()` is called. Default uses False.
 
         Examples:
             >>> ut.get_imports_on_period(["France", "DE", "GB"], ["09", "08", "07"], "2016-01", "2018-01")
@@ -231,10 +419,19 @@ class CensusClient:
             - Consider increasing `timeout`.
             - Data is only available from 2010-01.
         """
-        return self._get_flow_on_period(country, product, start=start,end= end,flux= 'imports')
+        if lazy:
+            if harmonize:
+                raise ValueError("`harmonize` is not available with lazy results - call `harmonize` on `to_pandas()`")
+            return self._get_flow_on_period(country, product, start=start, end=end, flux='imports', dataset=dataset,
+                                            fields=fields, predicates=predicates, lazy=True)
+        df = self._get_flow_on_period(country, product, start=start, end=end, flux='imports', dataset=dataset,
+                                      fields=fields, predicates=predicates)
+        return self._harmonize(df, harmonize, dataset) if harmonize else df
     
 
-    def get_exports_on_period(self, country : str| Country | list[str | Country], product : str|list[str], start: str, end: str)->pd.DataFrame:
+    def get_exports_on_period(self, country : str| Country | list[str | Country], product : str|list[str], start: str, end: str, dataset : str = "hs",
+                              fields : list[str] = None, predicates : dict = None, harmonize : str = None,
+                              lazy : bool = False)->pd.DataFrame | TradeResult:
         """
         Return the exports on the specified period.
 
@@ -247,6 +444,20 @@ class CensusClient:
                 Start date in format "YYYY-MM".
             end (str):
                 End date in format "YYYY-MM".
+            dataset (str):
+                The endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+            fields (list[str]):
+                The result columns to request (ex: ["country_code", "product_code", "import_value"]).
+                Default None requests every column.
+            predicates (dict):
+                Extra API filters added to the query (ex: {"COMM_LVL": "HS4", "DISTRICT": "13"}).
+            harmonize (str):
+                HS revision in which to express the whole period (ex: "HS2022"): values of codes split or
+                merged by a revision are reallocated. Needs a concordance table - the packaged one is empty,
+                assign `c.concordance = Concordance.from_csv(path)` first. Default None keeps the codes as reported.
+            lazy (bool):
+                Returns a TradeResult backed by NumPy arrays, which only builds the DataFrame when
+                `to_pandas()` is called. Default uses False.
 
         Examples:
             >>> ut.get_exports_on_period(["France", "DE", "GB"], ["09", "08", "07"], "2016-01", "2018-01")
@@ -259,65 +470,631 @@ class CensusClient:
             - Consider increasing `timeout`.
             - Data is only available from 2010-01.
         """
-        return self._get_flow_on_period(country, product, start=start, end=end, flux='exports')
+        if lazy:
+            if harmonize:
+                raise ValueError("`harmonize` is not available with lazy results - call `harmonize` on `to_pandas()`")
+            return self._get_flow_on_period(country, product, start=start, end=end, flux='exports', dataset=dataset,
+                                            fields=fields, predicates=predicates, lazy=True)
+        df = self._get_flow_on_period(country, product, start=start, end=end, flux='exports', dataset=dataset,
+                                      fields=fields, predicates=predicates)
+        return self._harmonize(df, harmonize, dataset) if harmonize else df
+
+
+    @property
+    def concordance(self) -> Concordance:
+        """
+        Links between HS revisions used by `harmonize` and `translate_codes` (assign a `Concordance` to use your own table)
+        """
+        if self._concordance is None:
+            self._concordance = default_concordance()
+        return self._concordance
 
+    @concordance.setter
+    def concordance(self, value: Concordance):
+        self._concordance = value
 
-    def _get_flow_on_period(self, country, product, start, end, flux):
-        url = self._build_params(country, product, start = start,end = end,flux= flux)
+    def translate_codes(self, series: pd.Series, from_version: str, to_version: str) -> pd.Series:
+        """
+        Translates a Series of HS codes from one HS revision to another
 
-        response = requests.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        
+        Examples:
+            >>> c.translate_codes(df["product_code"], "HS2012", "HS2022")
+        """
+        return self.concordance.translate(series, from_version, to_version)
+
+    def _harmonize(self, df, to_version, dataset):
+        if not datasets.get_dataset(dataset).hs_names:
+            raise ValueError(f"harmonize only applies to HS codes, not to the {dataset!r} dataset")
+        df = self.concordance.harmonize(df, to_version)
+        if "product_name" in df and df["product_name"].isna().any():
+            # codes created by the reallocation take their description from the nomenclature
+            names = df["product_name"].astype(object).fillna(df["product_code"].astype(object).map(self._product_names))
+            dtype = df["product_name"].dtype
+            df["product_name"] = names.astype("category" if isinstance(dtype, pd.CategoricalDtype) else dtype)
+        return df
+
+
+    def export_on_period(self,
+                         country : str| Country | list[str | Country],
+                         product : str|list[str],
+                         start: str,
+                         end: str,
+                         path: str,
+                         flux: Literal["imports", "exports"] = "imports",
+                         dataset: str = "hs",
+                         format: Literal["parquet", "csv"] = "parquet",
+                         partition_by: list[str] = ("year", "flux"),
+                         months_per_shard: int = 12,
+                         row_group_size: int | None = None,
+                         compression: str | None = "snappy",
+                         overwrite: bool = False)-> str:
+        """
+        Fetches the flux on the specified period shard by shard and writes it in a partitioned dataset.
+
+        Only one shard is held in memory at a time. The dataset is written in a temporary
+        folder next to `path` and moved to `path` once every shard has been written.
+
+        Args:
+            country (str | Country | list[str | Country]):
+                ISO2 code, full name, Census Bureau code, or a Country object.
+            product (str | list[str]):
+                HS code(s).
+            start (str):
+                Start date in format "YYYY-MM".
+            end (str):
+                End date in format "YYYY-MM".
+            path (str):
+                Folder of the dataset.
+            flux (Literal["imports", "exports"]):
+                The flux to fetch. Default uses "imports".
+            dataset (str):
+                The endpoint to query - "hs", "enduse", "naics", "porths" or "statehs". Default uses "hs".
+            format (Literal["parquet", "csv"]):
+                File format. Parquet requires pyarrow.
+            partition_by (list[str]):
+                Columns used as partition folders. "year", "month" and "flux" are derived from the result,
+                any other column of the result can be used. Default uses ("year", "flux").
+            months_per_shard (int):
+                Number of months fetched by one request.
+            row_group_size (int | None):
+                Maximum number of rows per Parquet row group.
+            compression (str | None):
+                Compression codec. Default uses "snappy" for Parquet, no compression for CSV.
+            overwrite (bool):
+                Replace `path` if it already exists.
 
+        Returns:
+            str:
+                The path of the dataset.
+
+        Examples:
+            >>> c = CensusClient(timeout=120)
+            >>> c.export_on_period(["France", "DE"], ["27"], "2010-01", "2025-01", "out/fuels", partition_by=["year", "flux"])
+        """
+        export._check_format(format)
+        if format == "csv" and compression == "snappy":
+            compression = None
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(f"{path!r} already exists - use overwrite=True to replace it")
+
+        shards = self._plan_period_shards(country, product, start, end, months_per_shard=months_per_shard)
+
+        staging = export._staging_dir(path)
         try:
-            data = response.json()
-        except requests.exceptions.JSONDecodeError:
-            raise EmptyResult(
-                f"The query '{response.url}' did not return any results."
-            )
-        header, rows = data[0], data[1:]
+            for i, shard in enumerate(shards):
+                try:
+                    df = self._get_flow_on_period(list(shard.countries), list(shard.products),
+                                                  shard.start, shard.end, flux, dataset=dataset)
+                except EmptyResult:
+                    continue
+                export.write_partitioned(df, staging, part=f"part-{i:05d}", flux=flux, format=format,
+                                         partition_by=partition_by, row_group_size=row_group_size,
+                                         compression=compression)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        export._publish(staging, path, overwrite)
+        return path
+
+
+    def update(self, df: pd.DataFrame, flux: Literal["imports", "exports"] = None, end: str = None, revision_months: int = 2, dataset: str = "hs")->pd.DataFrame:
+        """
+        Refreshes a result of `get_imports_on_period` or `get_exports_on_period` with the newest months.
 
-        df = pd.DataFrame(rows, columns=header)
-        
+        Only the months after the latest date held for each country/product are fetched, plus
+        the last `revision_months` months already held, which are replaced by their revised values.
+        Columns added to the result after the query are left empty on the fetched rows.
 
-        return (self._prepare_results_on_period(df))
+        Args:
+            df (pd.DataFrame):
+                A previous result, with at least the columns "date", "country_code" and "product_code".
+            flux (Literal["imports", "exports"]):
+                The flux of `df`. Default None infers it from the value columns.
+            end (str):
+                Last month to fetch in format "YYYY-MM". Default None uses the current month.
+            revision_months (int):
+                Number of months already held that are fetched again. Default uses 2.
+            dataset (str):
+                The endpoint `df` was fetched from. Default uses "hs".
 
+        Returns:
+            pd.DataFrame:
+                The merged result, sorted by date.
+
+        Examples:
+            >>> df = ut.get_imports_on_period("Mexico", "08", "2010-01", "2025-01")
+            >>> df = ut.update(df)
+        """
+        if df.empty:
+            raise ValueError("Cannot update an empty result - use get_imports_on_period or get_exports_on_period instead")
+        if revision_months < 0:
+            raise ValueError(f"revision_months must be positive - received {revision_months!r}")
+
+        if flux is None:
+            if "import_value" in df.columns:
+                flux = "imports"
+            elif "export_value" in df.columns:
+                flux = "exports"
+            else:
+                raise ValueError("Could not infer the flux of the result - specify `flux`")
+
+        if end is None:
+            end = datetime.now().strftime("%Y-%m")
+        end_idx = sharding._month_index(end)
+
+        keys = [k for k in ("country_code", "port_code", "state_code", "product_code") if k in df.columns]
+        month_idx = df["date"].dt.year * 12 + df["date"].dt.month - 1
+        first_fetched = month_idx.groupby([df[k] for k in keys]).transform("max") - revision_months + 1
+
+        starts = df[keys].assign(first_fetched=first_fetched).drop_duplicates(subset=keys)
+        starts = starts[starts["first_fetched"] <= end_idx]
+
+        fetched, refreshed = [], []
+        for first, group in starts.groupby("first_fetched"):
+            try:
+                new = self._get_flow_on_period(
+                    group["country_code"].unique().tolist(),
+                    group["product_code"].unique().tolist(),
+                    start=sharding._month_str(int(first)),
+                    end=end,
+                    flux=flux,
+                    dataset=dataset,
+                )
+            except EmptyResult:
+                continue
+            fetched.append(new.merge(group[keys], on=keys, how="inner"))
+            refreshed.append(group[keys])
 
+        if not fetched:
+            return df
 
-    def _prepare_results(self, df):
-        
-        df = df.rename(columns=self.col_mapping)
+        refreshed = pd.MultiIndex.from_frame(pd.concat(refreshed))
+        replaced = pd.MultiIndex.from_frame(df[keys]).isin(refreshed) & (month_idx >= first_fetched).to_numpy()
+        kept = df[~replaced]
+        # columns derived from the result (ex: yoy, suppressed) are left empty on the refreshed rows
+        return merge_sorted([kept] + [f.reindex(columns=df.columns) for f in fetched])
 
-        df["date"] = (pd.to_datetime(
-            df["year"].astype(str) + "-" + df["month"].astype(str).str.zfill(2))
-            .dt.to_period('M')
-        )
 
+    def _get_flow_on_period(self, country, product, start, end, flux, dataset="hs", fields=None, predicates=None, lazy=False):
+        if self.release_calendar:
+            if not self.is_published(flux, start):
+                raise EmptyResult(
+                    f"No {flux} data is published after {self.latest_month(flux)} - the period starting {start} is empty."
+                )
+            if not self.is_published(flux, end):
+                end = self.latest_month(flux)
+
+        with self._span("get_flow_on_period", flux=flux, start=start, end=end):
+            with self._span("build_params"):
+                url = self._build_params(country, product, start = start,end = end,flux= flux, dataset=dataset,
+                                         fields=fields, predicates=predicates)
+
+            def observe(data, seconds):
+                # only the requests actually sent tell the latency of the endpoint
+                if data is not None:
+                    self.shard_sizer.observe((flux, dataset), self._cells(country, product, start, end),
+                                             rows=len(data) - 1, seconds=seconds)
+
+            def fetch():
+                data = self._fetch_json(url, ttl=self._cache_ttl(flux, end), observe=observe)
+                if data is None:
+                    raise EmptyResult(
+                        f"The query '{url}' did not return any results."
+                    )
+                return data
+
+            def materialize(header, rows):
+                with self._span("dataframe", rows=len(rows)):
+                    df = pd.DataFrame(rows, columns=header)
+                # compact results leave the names to `with_names`, unless `fields` asks for them
+                if self.drop_descriptions and not self.compact or self.compact and fields is not None:
+                    df = self._attach_names(df, dataset, flux, fields)
+                return (self._prepare_results_on_period(df, keys=keys))
+
+            keys = self._validation_keys(dataset, flux, fields)
+            if lazy:
+                data, _ = self._inflight.do("raw:" + url, fetch)
+                return TradeResult(data[0], data[1:], self.col_mapping, materialize,
+                                   dedup=self.validate_results and keys != [])
+
+            def load():
+                data = fetch()
+                return materialize(data[0], data[1:])
+
+            df, shared = self._inflight.do(url, load)
+            if shared:
+                df = df.copy()
+
+        self._after_query(country, product, flux, dataset, fields, predicates, start=start, end=end)
+        return df
+
+    def enable_prefetch(self, max_concurrent: int = 2, interval: float | None = None, **kwargs) -> Prefetcher:
+        """
+        Fetches the likely follow-ups of each query in the background, into the response cache:
+        the children of the queried products, and the next month once it is released.
+
+        Args:
+            max_concurrent (int): maximum number of background requests at a time. Default uses 2.
+            interval (float | None): seconds between two checks for a new release of the recent queries. Default None disables them.
+            **kwargs: other options of `Prefetcher` (max_pending, children, next_month).
+
+        Examples:
+            >>> c = CensusClient(cache=MemoryCache())
+            >>> c.enable_prefetch(max_concurrent=2)
+        """
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        self.prefetcher = Prefetcher(self, max_concurrent=max_concurrent, interval=interval, **kwargs)
+        return self.prefetcher
+
+    def _after_query(self, country, product, flux, dataset, fields, predicates, **period):
+        # follow-ups are predicted for full queries only: a projection would not hit their cache entries
+        if self.prefetcher is None or fields is not None or predicates:
+            return
+        if isinstance(country, (str, countries.Country)):
+            country = [country]
+        if isinstance(product, str):
+            product = [product]
+        self.prefetcher.after(Query(flux, tuple(self._normalize_country(c) for c in country),
+                                    tuple(map(str, product)), dataset=dataset, **period))
+
+    def _fetch_json(self, url, ttl=None, observe=None):
+        """
+        Returns the JSON payload of the query, from the cache when one is set.
+
+        On a cache miss, the client takes a lease on the query before sending the request, so that
+        concurrent identical queries - from other threads, or other processes sharing the backend -
+        wait for that single request and read its response from the cache.
+        `observe` is passed to `_request_json`: it is only called when a request is sent.
+        """
+        if self.cache is None:
+            return self._request_json(url, observe=observe)
+
+        key = "census:" + hashlib.sha256(url.encode()).hexdigest()
+        with self._span("cache_get"):
+            cached = self.cache.get(key)
+        if cached is not None:
+            with self._span("json_decode", cached=True):
+                return json.loads(cached)
+
+        deadline = time.monotonic() + self.lease_ttl
+        leased = self.cache.acquire(key, ttl=self.lease_ttl)
+        while not leased:
+            time.sleep(self._CACHE_POLL_INTERVAL)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+            if time.monotonic() >= deadline:
+                break
+            leased = self.cache.acquire(key, ttl=self.lease_ttl)
+
+        try:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+            data = self._request_json(url, observe=observe)
+            # an empty answer is not cached: the month may just not be released yet
+            if data is not None:
+                with self._span("cache_set"):
+                    self.cache.set(key, json.dumps(data).encode(), ttl=ttl)
+            return data
+        finally:
+            if leased:
+                self.cache.release(key)
+
+    def _span(self, name, parent=None, **attributes):
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name, parent=parent, **attributes)
+
+    def _cache_ttl(self, flux, last_month):
+        """
+        Months before the latest release will not change until the next one: with the release
+        calendar enabled, queries ending before it are cached without expiry.
+        """
+        if self.cache is None:
+            return None
+        if self.release_calendar:
+            latest = self.latest_month(flux)
+            if latest is not None and sharding._month_index(last_month) < sharding._month_index(latest):
+                return None
+        return self.cache_ttl
+
+    def _request_json(self, url, observe=None):
+        """
+        Sends the request and decodes the JSON payload. Returns None when the API answered without data.
+
+        `requests` negotiates gzip/deflate, plus br and zstd when brotli or zstandard are installed,
+        and decompresses the body while reading it. The size of the response on the wire and once
+        decompressed is recorded in `transfers`, and `observe(data, seconds)` is called when given.
+        """
+        t0 = time.perf_counter()
+        with self._span("http_request", url=url):
+            response = requests.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        # the shards are sized from the time spent on the network, not in decoding
+        elapsed = time.perf_counter() - t0
+
+        with self._span("json_decode"):
+            try:
+                data = response.json()
+            except requests.exceptions.JSONDecodeError:
+                data = None
+
+        stats = transport._measure(url, response, elapsed)
+        with self._stats_lock:
+            self.transfers.append(stats)
+            self.bytes_transferred += stats.compressed_bytes or 0
+            self.bytes_decoded += stats.decoded_bytes or 0
+        if observe is not None:
+            observe(data, stats.elapsed)
+        return data
+
+    def transfer_summary(self)-> dict:
+        """
+        Returns the number of requests sent by the client and the bytes received, compressed and decompressed
+        """
+        with self._stats_lock:
+            return {
+                "requests": len(self.transfers),
+                "bytes_transferred": self.bytes_transferred,
+                "bytes_decoded": self.bytes_decoded,
+            }
+
+    def _settings(self) -> dict:
+        """
+        The arguments of the client, to build an equivalent one in another process
+        """
+        return {
+            "timeout": self.timeout,
+            "retries": self.retries,
+            "release_calendar": self.release_calendar,
+            "release_ttl": self.release_ttl,
+            "drop_descriptions": self.drop_descriptions,
+            "compact": self.compact,
+            "max_workers": self.max_workers,
+            "cache": self.cache,
+            "cache_ttl": self.cache_ttl,
+            "lease_ttl": self.lease_ttl,
+            "sort_results": self.sort_results,
+            "validate_results": self.validate_results,
+            "profile": self.profiler is not None,
+        }
 
+    def _attach_names(self, df, dataset, flux, fields):
+        ds = datasets.get_dataset(dataset)
+        if "CTY_CODE" in df and "CTY_NAME" not in df and (fields is None or "country_name" in fields):
+            df["CTY_NAME"] = df["CTY_CODE"].map(self._country_names)
+
+        product_var, desc_var = ds.product_var(flux), ds.product_desc_var(flux)
+        if ds.hs_names and product_var in df and desc_var not in df and (fields is None or "product_name" in fields):
+            df[desc_var] = df[product_var].map(self._product_names)
+
+        if fields is not None:
+            # codes only fetched to attach their names
+            extra = [v for v in ("CTY_CODE", product_var) if v in df and self.col_mapping.get(v, v) not in fields]
+            df = df.drop(columns=extra)
+        return df
+
+    def latest_month(self, flux: Literal["imports", "exports"])-> str | None:
+        """
+        Returns the latest month published by the API for the flux, in format 'YYYY-MM'.
+
+        The value is found with a small probe query and kept for `release_ttl` seconds.
+        Returns None if the probe did not return any month.
+        """
+        cached = self._latest_months.get(flux)
+        if cached is not None and time.monotonic() - cached[1] < self.release_ttl:
+            return cached[0]
+
+        flux_letter = flux[0].upper()
+        since = sharding._month_str(sharding._month_index(datetime.now().strftime("%Y-%m")) - 24)
+        url = (f"https://{self.BASE_URL}/data/timeseries/intltrade/{flux}/hs?get=CTY_CODE"
+               f"&CTY_CODE={self._RELEASE_PROBE_COUNTRY}&{flux_letter}_COMMODITY={self._RELEASE_PROBE_PRODUCT}&time=from+{since}")
+
+        data = self._request_json(url)
+
+        latest = None
+        if data:
+            header, rows = data[0], data[1:]
+            months = [row[header.index("time")] for row in rows]
+            latest = max(months) if months else None
+
+        self._latest_months[flux] = (latest, time.monotonic())
+        return latest
+
+    def is_published(self, flux: Literal["imports", "exports"], date: str)-> bool:
+        """
+        Returns True if the month `date` ('YYYY-MM') has already been published for the flux.
+
+        Months up to the latest published one will not be returned differently by a new request
+        until the next release, which makes them safe to reuse from a cache.
+        """
+        latest = self.latest_month(flux)
+        if latest is None:
+            return True
+        return sharding._month_index(date) <= sharding._month_index(latest)
+
+    def _plan_period_shards(self, country, product, start, end, months_per_shard=12, countries_per_shard=None,
+                            flux="imports", dataset="hs"):
+        if isinstance(country, (str, countries.Country)):
+            country = [country]
+        if isinstance(product, str):
+            product = [product]
+        cty_list = [self._normalize_country(c) for c in country]
+
+        if months_per_shard == "auto":
+            months_per_shard = self.shard_sizer.months_per_shard(
+                (flux, dataset), countries=min(len(cty_list), countries_per_shard or len(cty_list)), products=len(product)
+            )
+        return sharding.plan_shards(cty_list, list(product), start, end,
+                                    months_per_shard=months_per_shard,
+                                    countries_per_shard=countries_per_shard)
+
+
+
+    def _probe_period_shards(self, shards, flux="imports", dataset="hs", months_per_shard="auto"):
+        """
+        When "auto" shards were sized without any statistics on the endpoint, fetches the first shard
+        alone and plans the others again from what it observed.
+
+        Returns the frame of the first shard (None when nothing was fetched, an empty frame when the shard
+        has no data) and the shards left to fetch. A failed request raises, the plan being left unchanged.
+        """
+        if months_per_shard != "auto" or len(shards) < 2 or self.shard_sizer.stats((flux, dataset)) is not None:
+            return None, shards
+        first = shards[0]
+        try:
+            df = self._fetch_shard(first, flux, dataset=dataset)
+        except EmptyResult:
+            df = pd.DataFrame()
+        months = self.shard_sizer.months_per_shard((flux, dataset), countries=len(first.countries),
+                                                   products=len(first.products))
+        return df, sharding.replan_shards(shards, first, months)
+
+    def _cells(self, country, product, start, end):
+        n_countries = 1 if isinstance(country, (str, countries.Country)) else len(country)
+        n_products = 1 if isinstance(product, str) else len(product)
+        months = sharding._month_index(end) - sharding._month_index(start) + 1
+        return n_countries * n_products * months
+
+    def _fetch_shard(self, shard, flux, dataset="hs"):
+        """
+        Fetches a planned shard; a shard that times out is split in two and fetched again
+        """
+        try:
+            return self._get_flow_on_period(list(shard.countries), list(shard.products), shard.start, shard.end,
+                                            flux, dataset=dataset)
+        except requests.exceptions.Timeout:
+            self.shard_sizer.observe_timeout((flux, dataset), sharding.shard_cells(shard), self.timeout)
+            halves = sharding.split_shard(shard)
+            if halves is None:
+                raise
+
+        frames = []
+        with self._span("split_shard", start=shard.start, end=shard.end, countries=len(shard.countries)):
+            for half in halves:
+                try:
+                    frames.append(self._fetch_shard(half, flux, dataset))
+                except EmptyResult:
+                    continue
+        if not frames:
+            raise EmptyResult(f"The {flux} query between {shard.start} and {shard.end} did not return any results.")
+        return merge_sorted(frames, sort=self.sort_results)
+
+
+    def _prepare_results(self, df, keys=None):
         
-        existing_cols = [c for c in self._cols_to_return if c in df.columns]
+        with self._span("prepare"):
+            df = df.rename(columns=self.col_mapping)
+
+            df["date"] = (pd.to_datetime(
+                df["year"].astype(str) + "-" + df["month"].astype(str).str.zfill(2))
+                .dt.to_period('M')
+            )
 
-        df = df[existing_cols]
-        df = df.loc[:, ~df.columns.duplicated()]
 
-        return self._apply_types(df)
+            
+            existing_cols = [c for c in self._cols_to_return if c in df.columns]
+
+            df = df[existing_cols]
+            df = df.loc[:, ~df.columns.duplicated()]
+
+        return self._apply_types(df, keys=keys)
         
-    def _prepare_results_on_period(self, df):
-        df = df.rename(columns= self.col_mapping)
-        df["date"] = (
-            pd.to_datetime(df["time"], format="%Y-%m", errors="coerce")
-            .dt.to_period("M")
-        )
-
-        existing_cols = [c for c in self._cols_to_return if c in df.columns]
-        df = df[existing_cols]
-        df = df.loc[:, ~df.columns.duplicated()]
-
-        return self._apply_types(df)
+    def _prepare_results_on_period(self, df, keys=None):
+        with self._span("prepare"):
+            df = df.rename(columns= self.col_mapping)
+            df["date"] = (
+                pd.to_datetime(df["time"], format="%Y-%m", errors="coerce")
+                .dt.to_period("M")
+            )
+
+            existing_cols = [c for c in self._cols_to_return if c in df.columns]
+            df = df[existing_cols]
+            df = df.loc[:, ~df.columns.duplicated()]
+
+        return self._apply_types(df, keys=keys)
     
 
 
-    def _apply_types(self, df):
+    def _apply_types(self, df, keys=None):
+        with self._span("apply_types"):
+            df = self._cast_columns(df)
+
+        with self._span("sort", rows=len(df)):
+            # the API often answers in date order already: only sort when needed
+            if not self.sort_results or df.empty or df["date"].is_monotonic_increasing:
+                df = df.reset_index(drop=True)
+            else:
+                df = df.sort_values(by = "date", kind="stable").reset_index(drop=True)
+
+        return self._validated(df, keys=keys)
+
+    def validate(self, df: pd.DataFrame, hierarchy: bool = True, **kwargs) -> tuple[pd.DataFrame, validation.ValidationReport]:
+        """
+        Cleans a result: removes rows with duplicate keys, flags suppressed or missing values in a
+        "suppressed" column, and checks that the values of HS codes match the sum of their children
+        when the parent and all its children are in the result.
+
+        Returns:
+            tuple[pd.DataFrame, ValidationReport]: the cleaned result and what was found.
+
+        Examples:
+            >>> clean, report = c.validate(df)
+            >>> report.mismatches
+        """
+        if self._children_count is None:
+            self._children_count = {code: len(node.children) for code, node in self._code_tree.items() if node.children}
+        return validation.validate(df, children_count=self._children_count, hierarchy=hierarchy, **kwargs)
+
+    def _validation_keys(self, dataset, flux, fields):
+        """
+        The key columns `validate` uses for a query: None for the default ones, [] when a `fields`
+        projection leaves out a country, port, state or product column, since the rows it returns
+        can then only be told apart by the missing column
+        """
+        if fields is None:
+            return None
+        ds = datasets.get_dataset(dataset)
+        columns = {self.col_mapping.get(v, v) for v in ds.variables(flux)}
+        if any(k in columns and k not in fields for k in ("country_code", "port_code", "state_code", "product_code")):
+            return []
+        return None
+
+    def _validated(self, df, hierarchy=True, keys=None):
+        if not self.validate_results:
+            return df
+        if keys is not None and not keys:
+            # no duplicate can be told apart, and parents would be compared across the missing keys
+            hierarchy = False
+        with self._span("validate", rows=len(df)):
+            df, report = self.validate(df, hierarchy=hierarchy, keys=keys)
+        self.validation_reports.append(report)
+        return df
+
+    def _cast_columns(self, df):
         for col, t in self.type_map.items():
             if col not in df:
                 continue
@@ -338,7 +1115,36 @@ class CensusClient:
             elif t == "str":
                 df[col] = df[col].astype(str)
 
-        return df.sort_values(by = "date").reset_index(drop=True)
+        if self.compact:
+            for col in self._compact_cols:
+                if col in df:
+                    df[col] = df[col].astype("category")
+
+        return df
+
+    def with_names(self, df: pd.DataFrame)-> pd.DataFrame:
+        """
+        Adds the "country_name" and "product_name" columns to a result, from the local country and HS code tables.
+
+        Meant for the results of a client created with `compact=True`: the names are resolved once
+        per distinct code, and stay categorical when the codes are.
+
+        Args:
+            df (pd.DataFrame): a result with the columns "country_code" and/or "product_code"
+
+        Examples:
+            >>> c = CensusClient(compact=True)
+            >>> df = c.get_imports_on_period("Mexico", "08", "2010-01", "2025-01")
+            >>> c.with_names(df)
+        """
+        df = df.copy()
+        if "country_code" in df and "country_name" not in df:
+            df["country_name"] = df["country_code"].map(self._country_names)
+        if "product_code" in df and "product_name" not in df:
+            df["product_name"] = df["product_code"].map(self._product_names)
+
+        ordered = [c for c in self._cols_to_return if c in df.columns]
+        return df[ordered + [c for c in df.columns if c not in ordered]]
 
 
                                     ####### COUNTRIES FUNCTIONS #######
@@ -484,6 +1290,37 @@ class CensusClient:
             )
 
 
+    def find_codes(self, section: str | int = None, level: int = None, prefix: str = None,
+                   as_frame: bool = False) -> list[HSCode] | pd.DataFrame:
+        """
+        Returns the HS codes matching all the given criteria, in code order, from indexes built at load time.
+
+        Args:
+            section (str | int): the HS section, as a roman numeral ("XV") or a number (15).
+            level (int): the number of digits of the codes (2, 4 or 6).
+            prefix (str): the beginning of the codes (ex: "72").
+            as_frame (bool): returns a DataFrame instead of a list of HSCode. Default uses False.
+
+        Examples:
+            >>> ut.find_codes(section="XV", level=2)
+            >>> ut.find_codes(prefix="72", level=4, as_frame=True)
+        """
+        if prefix is not None and not isinstance(prefix, str):
+            raise InvalidCodeError(
+                f"Prefix must be a str instance - received a {type(prefix).__name__!r}"
+            )
+        found = self._hs_index.query(section=section, level=level, prefix=prefix)
+        if not as_frame:
+            return found
+        return pd.DataFrame({
+            "section": [c.section for c in found],
+            "hscode": [c.hscode for c in found],
+            "description": [c.description for c in found],
+            "parent": [c.parent for c in found],
+            "level": [c.level for c in found],
+        })
+
+
     def _normalize_kw(self, s: str) -> str:
         s = s.lower()
         s = unicodedata.normalize("NFKD", s)
@@ -529,8 +1366,11 @@ class CensusClient:
         results_code = []
         results_desc = []
 
-        for desc, code in self._desc_by_hs_codes.items():
-            if in_codes is not None and not code.hscode.startswith(in_codes):
+        # candidates within `in_codes` come from a range of the sorted index instead of a full scan
+        candidates = self._desc_by_hs_codes.values() if in_codes is None else self._hs_index.prefix(in_codes)
+        for code in candidates:
+            desc = code.description
+            if self._desc_by_hs_codes.get(desc) is not code:
                 continue
 
             tokens = self._tokenize(desc)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import List, Dict, Tuple
 import csv
+from bisect import bisect_left
 from importlib.resources import files
 
 
@@ -70,3 +71,86 @@ def build_tree_from_codes(codes: list[HSCode]) -> dict[str, HSCode]:
         parent_node.children.append(node.hscode)
 
     return code_dict
+
+
+_ROMAN = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X", "XI",
+          "XII", "XIII", "XIV", "XV", "XVI", "XVII", "XVIII", "XIX", "XX", "XXI"]
+
+
+class HSIndex:
+    """
+    Secondary indexes on the HS codes, built once: codes by section, codes by level,
+    and the sorted codes for prefix range queries.
+    """
+
+    def __init__(self, codes: list[HSCode]):
+        self._sorted = sorted(codes, key=lambda c: c.hscode)
+        self._keys = [c.hscode for c in self._sorted]
+        self._by_section: dict[str, list[HSCode]] = {}
+        self._by_level: dict[int, list[HSCode]] = {}
+        for c in self._sorted:
+            self._by_section.setdefault(c.section, []).append(c)
+            self._by_level.setdefault(c.level, []).append(c)
+
+    @staticmethod
+    def _section_name(section: str | int) -> str:
+        if isinstance(section, int):
+            if not 1 <= section <= len(_ROMAN):
+                raise ValueError(f"Invalid HS section: {section!r} (sections go from 1 to {len(_ROMAN)})")
+            return _ROMAN[section - 1]
+        return str(section).strip().upper()
+
+    def prefix(self, prefix: str) -> list[HSCode]:
+        """
+        Codes starting with `prefix`, in code order
+        """
+        if not prefix:
+            return list(self._sorted)
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo)
+        return self._sorted[lo:hi]
+
+    def section(self, section: str | int) -> list[HSCode]:
+        return list(self._by_section.get(self._section_name(section), []))
+
+    def level(self, level: int) -> list[HSCode]:
+        return list(self._by_level.get(int(level), []))
+
+    def query(self, section: str | int | None = None, level: int | None = None, prefix: str | None = None) -> list[HSCode]:
+        """
+        Codes matching all the given criteria, in code order
+        """
+        if prefix is not None:
+            candidates = self.prefix(prefix)
+        elif section is not None:
+            candidates = self._by_section.get(self._section_name(section), [])
+        elif level is not None:
+            candidates = self._by_level.get(int(level), [])
+        else:
+            candidates = self._sorted
+
+        if section is not None and prefix is not None:
+            name = self._section_name(section)
+            candidates = [c for c in candidates if c.section == name]
+        if level is not None and (prefix is not None or section is not None):
+            candidates = [c for c in candidates if c.level == int(level)]
+        return list(candidates)
+
+
+def _load_concordance(path: str | None = None) -> list[dict]:
+    """
+    Reads the links between HS revisions: one row per (from_version, from_code, to_version, to_code, weight),
+    where weight is the share of the value of from_code that goes to to_code.
+    """
+    source = files(__package__) / "data" / "hs-concordance.csv" if path is None else None
+    with (source.open(encoding="utf-8") if path is None else open(path, encoding="utf-8")) as f:
+        return [
+            {
+                "from_version": row["from_version"].strip().upper(),
+                "from_code": row["from_code"].strip(),
+                "to_version": row["to_version"].strip().upper(),
+                "to_code": row["to_code"].strip(),
+                "weight": float(row["weight"]) if row.get("weight") else 1.0,
+            }
+            for row in csv.DictReader(f)
+        ]
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+
+from . import codes
+from .errors import MissingConcordanceError
+
+
+# First year reported under each HS revision
+HS_VERSIONS = {"HS2007": 2007, "HS2012": 2012, "HS2017": 2017, "HS2022": 2022}
+_ORDER = list(HS_VERSIONS)
+_COLUMNS = ["from_version", "from_code", "to_version", "to_code", "weight"]
+
+
+def _check_version(version: str) -> str:
+    v = str(version).upper().replace(" ", "")
+    if v not in HS_VERSIONS:
+        raise ValueError(f"Unknown HS version: {version!r} (expected one of {', '.join(HS_VERSIONS)})")
+    return v
+
+
+def version_of(dates) -> np.ndarray:
+    """
+    Returns the HS revision in force at each date
+    """
+    years = pd.DatetimeIndex(pd.to_datetime(dates)).year.to_numpy()
+    idx = np.searchsorted(list(HS_VERSIONS.values()), years, side="right") - 1
+    return np.asarray(_ORDER, dtype=object)[np.clip(idx, 0, None)]
+
+
+class Concordance:
+    """
+    Links between the HS revisions, indexed by pair of adjacent revisions.
+
+    A code missing from the links of a revision is unchanged by that revision. Translations
+    between distant revisions go through the intermediate ones; a revision only given in one
+    direction is inverted (a split becomes a merge, a merge splits the value evenly). Crossing
+    a revision without any link in the table raises `MissingConcordanceError`.
+
+    Args:
+        links (list[dict] | pd.DataFrame): rows of from_version, from_code, to_version, to_code, weight,
+            where weight is the share of the value of from_code going to to_code.
+
+    Examples:
+        >>> from ustrade.concordance import Concordance
+        >>> conc = Concordance.from_csv("hs2017_hs2022.csv")
+        >>> conc.translate(df["product_code"], "HS2017", "HS2022")
+    """
+
+    def __init__(self, links: list[dict] | pd.DataFrame):
+        links = pd.DataFrame(links, columns=_COLUMNS)
+        self._steps: dict[tuple[str, str], pd.DataFrame] = {}
+        for (f, t), group in links.groupby(["from_version", "to_version"], sort=False):
+            self._steps[(_check_version(f), _check_version(t))] = (
+                group[["from_code", "to_code", "weight"]].astype({"weight": float})
+                .set_index("from_code").sort_index()
+            )
+
+    @classmethod
+    def from_csv(cls, path: str | None = None) -> "Concordance":
+        """
+        Loads a table of links; None loads the one packaged with the library
+        """
+        return cls(codes._load_concordance(path))
+
+    def _step(self, from_version: str, to_version: str) -> pd.DataFrame:
+        table = self._steps.get((from_version, to_version))
+        if table is not None:
+            return table
+        reverse = self._steps.get((to_version, from_version))
+        if reverse is None:
+            # without any link the codes would silently be kept as they are
+            raise MissingConcordanceError(
+                f"The concordance has no links between {from_version} and {to_version} - "
+                f"load a table covering this revision with `Concordance.from_csv(path)`"
+            )
+        table = (reverse.reset_index()
+                 .rename(columns={"from_code": "to_code", "to_code": "from_code"}))
+        table["weight"] = 1.0 / table.groupby("from_code")["to_code"].transform("size")
+        table = table.set_index("from_code")[["to_code", "weight"]].sort_index()
+        self._steps[(from_version, to_version)] = table
+        return table
+
+    def links(self, hs_codes, from_version: str, to_version: str) -> pd.DataFrame:
+        """
+        Returns, for each code, the codes of `to_version` it maps to and the share of its value each one receives
+        """
+        i, j = _ORDER.index(_check_version(from_version)), _ORDER.index(_check_version(to_version))
+        cur = pd.DataFrame({"code": hs_codes, "to_code": hs_codes, "weight": 1.0})
+        direction = 1 if j > i else -1
+        for k in range(i, j, direction):
+            table = self._step(_ORDER[k], _ORDER[k + direction])
+            hit = cur["to_code"].isin(table.index).to_numpy()
+            if not hit.any():
+                continue
+            moved = cur[hit].merge(table, left_on="to_code", right_index=True, suffixes=("", "_step"))
+            moved["to_code"] = moved["to_code_step"]
+            moved["weight"] = moved["weight"] * moved["weight_step"]
+            cur = pd.concat([cur[~hit], moved[["code", "to_code", "weight"]]], ignore_index=True)
+        return cur.groupby(["code", "to_code"], as_index=False, sort=False)["weight"].sum()
+
+    def translate(self, series: pd.Series, from_version: str, to_version: str) -> pd.Series:
+        """
+        Translates codes one to one: a code split by a revision takes the code receiving its largest share.
+        A categorical Series gets new categories, the translated codes.
+        """
+        labels, uniques = pd.factorize(series)
+        links = self.links(np.asarray(uniques, dtype=object), from_version, to_version)
+        best = (links.sort_values("weight", ascending=False, kind="stable")
+                .drop_duplicates("code").set_index("code")["to_code"])
+        mapped = best.reindex(uniques).to_numpy(dtype=object)
+        out = pd.Series(np.where(labels >= 0, mapped[labels], None), index=series.index, name=series.name)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # the categories of the input are the codes before translation
+            return out.astype("category")
+        return out.astype(series.dtype)
+
+    def harmonize(self, df: pd.DataFrame, to_version: str, from_version: str | None = None,
+                  code_col: str = "product_code", values: list[str] | None = None) -> pd.DataFrame:
+        """
+        Expresses a result in a single HS revision, reallocating the values of codes that were split or merged.
+
+        Args:
+            df (pd.DataFrame): result of a query.
+            to_version (str): the target revision (ex: "HS2022").
+            from_version (str | None): revision of the codes of `df`. Default uses the revision in force at each date.
+            code_col (str): the column holding the codes. Default uses "product_code".
+            values (list[str] | None): the columns reallocated. Default uses the columns ending with "_value".
+
+        The `product_name` of a row moved to another code is left empty, unless an unchanged row of that code provides it.
+        """
+        to_version = _check_version(to_version)
+        if df.empty:
+            return df
+        values = list(values) if values is not None else [c for c in df.columns if c.endswith("_value")]
+        if from_version is not None:
+            src = np.full(len(df), _check_version(from_version), dtype=object)
+        else:
+            src = version_of(df["date"])
+
+        parts, changed = [], False
+        for version in pd.unique(src):
+            part = df[src == version]
+            if version == to_version:
+                parts.append(part)
+                continue
+            links = self.links(part[code_col].unique(), version, to_version)
+            if (links["code"] == links["to_code"]).all():
+                parts.append(part)
+                continue
+            changed = True
+            moved = part.merge(links, left_on=code_col, right_on="code", how="left", sort=False)
+            moved[code_col] = moved["to_code"]
+            if "product_name" in moved:
+                # the description belongs to the former code
+                moved.loc[moved["code"] != moved["to_code"], "product_name"] = None
+            moved[values] = moved[values].mul(moved["weight"], axis=0)
+            parts.append(moved.drop(columns=["code", "to_code", "weight"]))
+        if not changed:
+            return df
+
+        out = pd.concat(parts, ignore_index=True)
+        keys = [c for c in out.columns if c not in values and c != "product_name"]
+        groups = out.groupby(keys, sort=False, dropna=False, observed=True)
+        res = groups[[c for c in out.columns if c not in keys]].first()
+        if values:
+            res[values] = groups[values].sum(min_count=1)
+        return res.reset_index()[list(df.columns)]
+
+
+_default: Concordance | None = None
+
+
+def default_concordance() -> Concordance:
+    global _default
+    if _default is None:
+        _default = Concordance.from_csv()
+    return _default
+
+
+def translate_codes(series: pd.Series, from_version: str, to_version: str,
+                    concordance: Concordance | None = None) -> pd.Series:
+    """
+    Translates a Series of HS codes from one HS revision to another
+
+    Args:
+        series (pd.Series): the codes.
+        from_version (str): the revision of the codes (ex: "HS2012").
+        to_version (str): the target revision (ex: "HS2022").
+        concordance (Concordance | None): the links used. Default uses the table packaged with the library.
+
+    Examples:
+        >>> ut.translate_codes(df["product_code"], "HS2012", "HS2022")
+    """
+    return (concordance or default_concordance()).translate(series, from_version, to_version)
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+
+
+_VALUES = {
+    "imports": ("GEN_VAL_MO", "CON_VAL_MO"),
+    "exports": ("ALL_VAL_MO",),
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    An endpoint of the International Trade API (`/intltrade/{flux}/{name}`).
+
+    `product` and `product_desc` are the variables of the product classification, where
+    '{L}' stands for the flux letter ('I' for imports, 'E' for exports).
+    `hs_names` is True when the product descriptions can be found in the local HS code table.
+    """
+    name: str
+    product: str
+    product_desc: str
+    extra: tuple = ()
+    hs_names: bool = False
+
+    def product_var(self, flux: str) -> str:
+        return self.product.format(L=flux[0].upper())
+
+    def product_desc_var(self, flux: str) -> str:
+        return self.product_desc.format(L=flux[0].upper())
+
+    def variables(self, flux: str) -> list[str]:
+        letter = flux[0].upper()
+        return [
+            "CTY_CODE",
+            "CTY_NAME",
+            *self.extra,
+            self.product.format(L=letter),
+            self.product_desc.format(L=letter),
+            *_VALUES[flux],
+        ]
+
+
+DATASETS = {
+    "hs": Dataset("hs", "{L}_COMMODITY", "{L}_COMMODITY_SDESC", hs_names=True),
+    "enduse": Dataset("enduse", "{L}_ENDUSE", "{L}_ENDUSE_LDESC"),
+    "naics": Dataset("naics", "NAICS", "NAICS_LDESC"),
+    "porths": Dataset("porths", "{L}_COMMODITY", "{L}_COMMODITY_SDESC", extra=("PORT", "PORT_NAME"), hs_names=True),
+    "statehs": Dataset("statehs", "{L}_COMMODITY", "{L}_COMMODITY_SDESC", extra=("STATE",), hs_names=True),
+}
+
+
+def get_dataset(name: str) -> Dataset:
+    try:
+        return DATASETS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown dataset: {name!r} - expected one of {', '.join(DATASETS)}"
+        ) from None
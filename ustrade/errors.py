@@ -9,6 +9,12 @@ class USTradeError(Exception):
 class APITimeOutError(USTradeError):
     pass
 
+class CacheError(USTradeError):
+    """
+    The cache backend returned an error
+    """
+    pass
+
 
 ##### Data search error ##################################################
 
@@ -44,4 +50,10 @@ class CodeNotFoundError(USTradeError):
     """
     pass
 
+class MissingConcordanceError(USTradeError):
+    """
+    The concordance table has no links for a revision the translation has to cross
+    """
+    pass
+
 
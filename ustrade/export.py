@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from importlib.util import find_spec
+from typing import Literal
+
+import pandas as pd
+
+
+# folder of the rows whose partition value is missing, as named by Hive, Spark and pyarrow
+_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+_DERIVED_COLUMNS = {
+    "year": lambda df, flux: df["date"].dt.year,
+    "month": lambda df, flux: df["date"].dt.month,
+    "flux": lambda df, flux: pd.Series(flux, index=df.index),
+}
+
+
+def _check_format(format: str):
+    if format == "parquet":
+        if find_spec("pyarrow") is None:
+            raise ImportError("Parquet export requires pyarrow - install it with `pip install ustrade[arrow]`")
+    elif format != "csv":
+        raise ValueError(f"Invalid export format: {format!r}")
+
+
+def _partition_columns(df: pd.DataFrame, partition_by: list[str], flux: str) -> pd.DataFrame:
+    parts = {}
+    for col in partition_by:
+        if col in _DERIVED_COLUMNS:
+            parts[col] = _DERIVED_COLUMNS[col](df, flux)
+        elif col in df.columns:
+            parts[col] = df[col]
+        else:
+            raise ValueError(f"Cannot partition on unknown column: {col!r}")
+    return pd.DataFrame(parts, index=df.index)
+
+
+def _partition_value(value) -> str:
+    return _NULL_PARTITION if pd.isna(value) else str(value)
+
+
+def write_partitioned(df: pd.DataFrame,
+                      root: str,
+                      part: str,
+                      flux: str,
+                      format: Literal["parquet", "csv"] = "parquet",
+                      partition_by: list[str] = (),
+                      row_group_size: int | None = None,
+                      compression: str | None = None) -> list[str]:
+    """
+    Writes a result in a hive-partitioned dataset (`root/year=2020/flux=imports/<part>.parquet`).
+
+    The partition columns are encoded in the directory names and are not written in the files;
+    rows with a missing partition value go to `col=__HIVE_DEFAULT_PARTITION__`.
+    Returns the list of the written files.
+    """
+    partition_by = list(partition_by)
+    written = []
+
+    if partition_by:
+        keys = _partition_columns(df, partition_by, flux)
+        data = df.drop(columns=[c for c in partition_by if c in df.columns])
+        groups = data.groupby([keys[c] for c in partition_by], sort=False, dropna=False, observed=True)
+    else:
+        groups = [((), df)]
+
+    for values, sub in groups:
+        if not isinstance(values, tuple):
+            values = (values,)
+        folder = os.path.join(root, *(f"{col}={_partition_value(val)}" for col, val in zip(partition_by, values)))
+        os.makedirs(folder, exist_ok=True)
+
+        if format == "parquet":
+            file = os.path.join(folder, f"{part}.parquet")
+            kwargs = {"row_group_size": row_group_size} if row_group_size else {}
+            sub.to_parquet(file, index=False, compression=compression, **kwargs)
+        else:
+            suffix = {"gzip": ".gz", "bz2": ".bz2", "zstd": ".zst", "xz": ".xz"}.get(compression, "")
+            file = os.path.join(folder, f"{part}.csv{suffix}")
+            sub.to_csv(file, index=False, compression=compression)
+        written.append(file)
+
+    return written
+
+
+def _staging_dir(path: str) -> str:
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f".{os.path.basename(path)}.", dir=parent)
+
+
+def _publish(staging: str, path: str, overwrite: bool):
+    if os.path.exists(path):
+        if not overwrite:
+            shutil.rmtree(staging)
+            raise FileExistsError(f"{path!r} already exists - use overwrite=True to replace it")
+        previous = staging + ".old"
+        os.replace(path, previous)
+        os.replace(staging, path)
+        shutil.rmtree(previous)
+    else:
+        os.replace(staging, path)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+
+def _is_chained(frames: list[pd.DataFrame], key: str) -> bool:
+    """
+    True when the frames follow each other: each one starts at or after the end of the previous one
+    """
+    return all(prev[key].iloc[-1] <= nxt[key].iloc[0] for prev, nxt in zip(frames, frames[1:]))
+
+
+def _merge_order(frames: list[pd.DataFrame], key: str, n: int) -> np.ndarray:
+    keys = np.empty(n, dtype=frames[0][key].to_numpy().dtype)
+    offset = 0
+    for f in frames:
+        keys[offset:offset + len(f)] = f[key].to_numpy()
+        offset += len(f)
+    # Timsort finds the k sorted runs and merges them: O(n log k) instead of a full sort
+    return np.argsort(keys, kind="stable")
+
+
+def _union_dtype(dtypes) -> pd.CategoricalDtype | None:
+    """
+    The categorical dtype holding the categories of every dtype, None when they cannot be combined
+    """
+    dtypes = list(dtypes)
+    if not all(isinstance(d, pd.CategoricalDtype) for d in dtypes) or any(d.ordered for d in dtypes):
+        return None
+    categories = dtypes[0].categories
+    for d in dtypes[1:]:
+        categories = categories.append(d.categories[~d.categories.isin(categories)])
+    return pd.CategoricalDtype(categories)
+
+
+def _fill_column(frames: list[pd.DataFrame], col: str, n: int, positions: list, order: np.ndarray | None):
+    dtypes = {f[col].dtype for f in frames if col in f}
+    if len(dtypes) > 1 and all(col in f for f in frames):
+        # categoricals of shards holding different codes: recode them on the union of their categories
+        union = _union_dtype(dtypes)
+        if union is not None:
+            dtypes = {union}
+
+    if len(dtypes) != 1 or any(col not in f for f in frames):
+        # shards disagree on this column: let pandas find the common dtype
+        merged = pd.concat([f[col] if col in f else pd.Series(np.nan, index=f.index) for f in frames],
+                           ignore_index=True)
+        return (merged if order is None else merged.iloc[order]).array
+
+    dtype = dtypes.pop()
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = np.empty(n, dtype=np.min_scalar_type(-max(1, len(dtype.categories))))
+        for pos, f in zip(positions, frames):
+            values = f[col].cat
+            if values.categories.equals(dtype.categories):
+                codes[pos] = values.codes.to_numpy()
+            else:
+                # the last entry maps the missing values (code -1) to themselves
+                recode = np.append(dtype.categories.get_indexer(values.categories), -1)
+                codes[pos] = recode[values.codes.to_numpy()]
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+
+    if isinstance(dtype, np.dtype):
+        out = np.empty(n, dtype=dtype)
+        for pos, f in zip(positions, frames):
+            out[pos] = f[col].to_numpy()
+        return out
+
+    out = np.empty(n, dtype=object)
+    for pos, f in zip(positions, frames):
+        out[pos] = f[col].to_numpy(dtype=object)
+    return pd.array(out, dtype=dtype)
+
+
+def merge_sorted(frames: list[pd.DataFrame], key: str = "date", sort: bool = True) -> pd.DataFrame:
+    """
+    Concatenates results that are each already sorted on `key` into one result sorted on `key`.
+
+    Each final column is allocated once and every shard is written straight at its merged
+    position, instead of concatenating everything and sorting the copy. Shards covering
+    consecutive periods are simply laid end to end.
+
+    Args:
+        frames (list[pd.DataFrame]): the shards, each sorted on `key`
+        key (str): the sort column. Default uses "date".
+        sort (bool): False only concatenates the shards, in the given order.
+    """
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+
+    n = sum(len(f) for f in frames)
+    bounds = np.cumsum([0] + [len(f) for f in frames])
+
+    if not sort or _is_chained(frames, key):
+        order = None
+        positions = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    else:
+        order = _merge_order(frames, key, n)
+        target = np.empty(n, dtype=np.intp)
+        target[order] = np.arange(n)
+        positions = [target[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    columns = list(dict.fromkeys(col for f in frames for col in f.columns))
+    return pd.DataFrame({col: _fill_column(frames, col, n, positions, order) for col in columns})
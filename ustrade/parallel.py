@@ -0,0 +1,185 @@
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal
+
+import pandas as pd
+
+from .client import CensusClient
+from .countries import Country
+from .errors import EmptyResult
+from .merge import merge_sorted
+from .profiling import Profiler
+from .sharding import Shard
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+
+# Client used by the worker processes. With the 'fork' start method it is set in the
+# parent right before the pool is created, so the workers inherit the already loaded
+# country and HS code tables instead of parsing the CSV files again. Otherwise each
+# worker builds a client with the same settings (and cache backend) as the parent's.
+_WORKER_CLIENT: CensusClient | None = None
+
+
+def _init_worker(settings: dict):
+    global _WORKER_CLIENT
+    if _WORKER_CLIENT is None:
+        _WORKER_CLIENT = CensusClient(**settings)
+    _WORKER_CLIENT.shard_sizer.journal = []
+    if _WORKER_CLIENT.profiler is not None:
+        # a forked worker would otherwise start with the parent's spans and open stack
+        _WORKER_CLIENT.profiler = Profiler()
+
+
+def _encode(df: pd.DataFrame, transport: str):
+    if transport == "arrow":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    columns = {}
+    for col in df.columns:
+        values = df[col].array
+        if isinstance(values, pd.Categorical):
+            # to_numpy() would expand the categories: the codes are sent with the categories instead
+            columns[col] = (values.codes, values.categories.to_numpy(), values.ordered)
+        else:
+            columns[col] = df[col].to_numpy()
+    return columns
+
+
+def _decode(payload, transport: str) -> pd.DataFrame:
+    if transport == "arrow":
+        return pa.ipc.open_stream(payload).read_all().to_pandas()
+    return pd.DataFrame({
+        col: pd.Categorical.from_codes(*values) if isinstance(values, tuple) else values
+        for col, values in payload.items()
+    })
+
+
+def _run_shard(shard: Shard, flux: str, dataset: str, transport: str):
+    """
+    Fetches a shard in a worker; returns the encoded result, what the worker's shard sizer observed
+    and the spans the worker recorded (with the start of its clock), or None without profiling
+    """
+    journal = _WORKER_CLIENT.shard_sizer.journal
+    journal.clear()
+    profiler = _WORKER_CLIENT.profiler
+    if profiler is not None:
+        profiler.clear()
+    try:
+        df = _WORKER_CLIENT._fetch_shard(shard, flux, dataset=dataset)
+        payload = _encode(df, transport)
+    except EmptyResult:
+        payload = None
+    spans = (list(profiler.spans), profiler._epoch_ns) if profiler is not None else None
+    return payload, list(journal), spans
+
+
+class ProcessExecutor:
+    """
+    Runs period queries split in shards on a pool of processes.
+
+    Each worker fetches one shard, decodes and types it, and sends it back to the parent
+    as an Arrow IPC buffer (when pyarrow is installed) or as plain NumPy columns.
+
+    Args:
+        client (CensusClient): client whose settings and reference data are used by the workers. Default creates a new one.
+        max_workers (int): number of processes. Default uses the number of CPUs.
+        months_per_shard (int | Literal["auto"]): maximum number of months fetched by one request. "auto" sizes the
+            shards from the rows and latencies observed by the client on the endpoint.
+        countries_per_shard (int | None): maximum number of countries fetched by one request. None keeps them together.
+        transport (Literal["auto", "arrow", "numpy"]): how the shards are sent back to the parent process.
+        start_method (str | None): multiprocessing start method. Default uses 'fork' when the platform supports it.
+
+    Examples:
+        >>> from ustrade.parallel import ProcessExecutor
+        >>> ex = ProcessExecutor(max_workers=8, months_per_shard=6)
+        >>> ex.get_imports_on_period(["France", "DE", "GB"], ["09", "08"], "2010-01", "2025-01")
+    """
+
+    def __init__(self,
+                 client: CensusClient | None = None,
+                 max_workers: int | None = None,
+                 months_per_shard: int | Literal["auto"] = 12,
+                 countries_per_shard: int | None = None,
+                 transport: Literal["auto", "arrow", "numpy"] = "auto",
+                 start_method: str | None = None):
+        self.client = client if client is not None else CensusClient()
+        self.max_workers = max_workers
+        self.months_per_shard = months_per_shard
+        self.countries_per_shard = countries_per_shard
+
+        if transport == "auto":
+            transport = "arrow" if pa is not None else "numpy"
+        elif transport == "arrow" and pa is None:
+            raise ImportError("transport='arrow' requires pyarrow - install it with `pip install ustrade[arrow]`")
+        elif transport not in ("arrow", "numpy"):
+            raise ValueError(f"Invalid transport: {transport!r}")
+        self.transport = transport
+
+        if start_method is None:
+            start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        self.start_method = start_method
+
+    def get_imports_on_period(self, country: str | Country | list[str | Country], product: str | list[str], start: str, end: str, dataset: str = "hs") -> pd.DataFrame:
+        """
+        Return the imports on the specified period, fetched in parallel shards
+        """
+        return self._run(country, product, start, end, "imports", dataset)
+
+    def get_exports_on_period(self, country: str | Country | list[str | Country], product: str | list[str], start: str, end: str, dataset: str = "hs") -> pd.DataFrame:
+        """
+        Return the exports on the specified period, fetched in parallel shards
+        """
+        return self._run(country, product, start, end, "exports", dataset)
+
+    def _run(self, country, product, start, end, flux, dataset="hs") -> pd.DataFrame:
+        global _WORKER_CLIENT
+
+        shards = self.client._plan_period_shards(
+            country, product, start, end,
+            months_per_shard=self.months_per_shard,
+            countries_per_shard=self.countries_per_shard,
+            flux=flux,
+            dataset=dataset,
+        )
+
+        # nothing observed on the endpoint yet: the other shards are sized from a first request
+        first, shards = self.client._probe_period_shards(shards, flux, dataset, self.months_per_shard)
+        frames = [first] if first is not None and not first.empty else []
+
+        ctx = mp.get_context(self.start_method)
+        if self.start_method == "fork":
+            _WORKER_CLIENT = self.client
+        try:
+            with self.client._span("process_pool", shards=len(shards), transport=self.transport) as span:
+                with ProcessPoolExecutor(max_workers=self.max_workers,
+                                         mp_context=ctx,
+                                         initializer=_init_worker,
+                                         initargs=(self.client._settings(),)) as pool:
+                    payloads = list(pool.map(_run_shard, shards,
+                                             [flux] * len(shards),
+                                             [dataset] * len(shards),
+                                             [self.transport] * len(shards)))
+        finally:
+            _WORKER_CLIENT = None
+
+        # the workers' statistics and spans stay in their processes: record them in the parent's
+        for _, journal, spans in payloads:
+            self.client.shard_sizer.replay(journal)
+            if spans is not None and self.client.profiler is not None:
+                self.client.profiler.adopt(*spans, parent=span.span_id)
+
+        frames += [_decode(p, self.transport) for p, _, _ in payloads if p is not None]
+        if not frames:
+            raise EmptyResult(
+                f"The {flux} query between {start} and {end} did not return any results."
+            )
+
+        # Each shard comes back sorted by date: merge them instead of sorting the concatenation
+        return self.client._validated(merge_sorted(frames, sort=self.client.sort_results))
@@ -0,0 +1,214 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from . import sharding
+from .errors import USTradeError
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    A query of the client: a single month (`date`) or a period (`start`, `end`)
+    """
+    flux: str
+    countries: tuple[str, ...]
+    products: tuple[str, ...]
+    date: str | None = None
+    start: str | None = None
+    end: str | None = None
+    dataset: str = "hs"
+
+    @property
+    def last_month(self) -> str:
+        return self.date or self.end
+
+    def url(self, client) -> str:
+        return client._build_params(list(self.countries), list(self.products), self.flux, date=self.date,
+                                    start=self.start, end=self.end, dataset=self.dataset)
+
+
+class Prefetcher:
+    """
+    Fetches the likely follow-ups of the queries of a client in the background, into its response cache.
+
+    After each query, two follow-ups are predicted: the same query on the children of the
+    products (the next drill-down), and the same query on the month following it when that
+    month is the latest release. With `interval`, the recent queries are also checked on a
+    schedule so that a new release is in the cache before anyone asks for it.
+
+    Args:
+        client (CensusClient): the client, which must have a `cache`.
+        max_concurrent (int): maximum number of background requests at a time. Default uses 2.
+        max_pending (int): predictions beyond this number of queued requests are dropped. Default uses 64.
+        children (bool): prefetch the children of the queried products. Default uses True.
+        next_month (bool): prefetch the month following the query when it is the latest release. Default uses True.
+        interval (float | None): seconds between two scheduled checks for a new release. Default None disables them.
+
+    Examples:
+        >>> c = CensusClient(cache=SQLiteCache("ustrade.db"))
+        >>> c.enable_prefetch(max_concurrent=2, interval=3600)
+        >>> c.get_imports(["France", "DE"], "84", "2025-01")   # "8401".."8487" are fetched in the background
+    """
+
+    def __init__(self, client, max_concurrent: int = 2, max_pending: int = 64, children: bool = True,
+                 next_month: bool = True, interval: float | None = None):
+        if client.cache is None:
+            raise ValueError("Prefetching fills the response cache: the client needs a `cache`")
+        self.client = client
+        self.max_pending = max_pending
+        self.children = children
+        self.next_month = next_month
+        self.interval = interval
+
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="ustrade-prefetch")
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        self._recent: deque[Query] = deque(maxlen=32)
+        self._stop = threading.Event()
+        self._idle = threading.Condition()
+        self._active = 0
+        self._timer = None
+
+        self.fetched = 0
+        self.dropped = 0
+        self.failed = 0
+
+        if interval is not None:
+            self._timer = threading.Thread(target=self._schedule, name="ustrade-prefetch-timer", daemon=True)
+            self._timer.start()
+
+    def predict(self, query: Query) -> list[Query]:
+        """
+        Returns the queries likely to follow `query`
+        """
+        predicted = []
+        if self.children:
+            children = []
+            for product in query.products:
+                try:
+                    children.extend(self.client.get_children_codes(product, return_names=False))
+                except USTradeError:
+                    continue
+            if children:
+                predicted.append(replace(query, products=tuple(children)))
+
+        if self.next_month:
+            following = self._next_release(query)
+            if following is not None:
+                predicted.append(following)
+        return predicted
+
+    def _next_release(self, query: Query) -> Query | None:
+        """
+        The query on the month after it, if that month is the latest release.
+
+        Only the new month is fetched, for a single month as for a period: older months
+        were released long ago and are not a likely follow-up.
+        """
+        latest = self.client.latest_month(query.flux)
+        nxt = sharding._month_index(query.last_month) + 1
+        if latest is None or nxt != sharding._month_index(latest):
+            return None
+        return replace(query, date=sharding._month_str(nxt), start=None, end=None)
+
+    def after(self, query: Query):
+        """
+        Records a query answered by the client and prefetches its follow-ups
+        """
+        with self._lock:
+            if query not in self._recent:
+                self._recent.append(query)
+        self._submit(self._predict_and_prefetch, query)
+
+    def prefetch(self, query: Query):
+        """
+        Fetches a query into the cache in the background
+        """
+        url = query.url(self.client)
+        with self._lock:
+            if url in self._pending:
+                return
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.add(url)
+        if not self._submit(self._load, query, url):
+            with self._lock:
+                self._pending.discard(url)
+
+    def refresh(self):
+        """
+        Prefetches the next month of the recent queries when it has been released
+        """
+        with self._lock:
+            recent = list(self._recent)
+        for query in recent:
+            following = self._next_release(query)
+            if following is not None:
+                self.prefetch(following)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until the background work is done; returns False if `timeout` expired first
+        """
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout=timeout)
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args) -> bool:
+        if self._stop.is_set():
+            return False
+
+        def task():
+            try:
+                fn(*args)
+            finally:
+                with self._idle:
+                    self._active -= 1
+                    self._idle.notify_all()
+
+        with self._idle:
+            self._active += 1
+        try:
+            self._pool.submit(task)
+        except RuntimeError:
+            with self._idle:
+                self._active -= 1
+                self._idle.notify_all()
+            return False
+        return True
+
+    def _predict_and_prefetch(self, query):
+        try:
+            predicted = self.predict(query)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            return
+        for q in predicted:
+            self.prefetch(q)
+
+    def _load(self, query, url):
+        try:
+            self.client._fetch_json(url, ttl=self.client._cache_ttl(query.flux, query.last_month))
+            with self._lock:
+                self.fetched += 1
+        except Exception:
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self._pending.discard(url)
+
+    def _schedule(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                with self._lock:
+                    self.failed += 1
@@ -0,0 +1,165 @@
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+
+import pandas as pd
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: int
+    parent_id: int | None
+    thread_id: int
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    process_id: int = field(default_factory=os.getpid)
+
+    @property
+    def duration(self) -> float:
+        """
+        Duration of the span in seconds
+        """
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e9
+
+
+class Profiler:
+    """
+    Records nested timing spans of the stages of each query.
+
+    Spans opened in the same thread are nested automatically; work handed to another thread
+    is attached to its parent with the `parent` argument.
+
+    Examples:
+        >>> c = CensusClient(profile=True)
+        >>> c.get_imports_on_period("Mexico", "08", "2010-01", "2025-01")
+        >>> c.profiler.summary()
+        >>> c.profiler.save_chrome_trace("trace.json")
+    """
+
+    def __init__(self):
+        self.spans: list[Span] = []
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._epoch_ns = time.time_ns() - self._origin_ns
+
+    def _stack(self) -> list[int]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self) -> int | None:
+        """
+        Returns the id of the innermost open span of the calling thread
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name: str, parent: int | None = None, **attributes):
+        stack = self._stack()
+        span = Span(
+            name=name,
+            span_id=next(self._ids),
+            parent_id=parent if parent is not None else (stack[-1] if stack else None),
+            thread_id=threading.get_ident(),
+            start_ns=time.perf_counter_ns(),
+            attributes=attributes,
+        )
+        with self._lock:
+            self.spans.append(span)
+        stack.append(span.span_id)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.end_ns = time.perf_counter_ns()
+
+    def clear(self):
+        with self._lock:
+            self.spans = []
+
+    def adopt(self, spans: list[Span], epoch_ns: int, parent: int | None = None):
+        """
+        Appends spans recorded by another profiler (ex: in a worker process) whose clock started at `epoch_ns`:
+        they get new ids, and their root spans are attached to `parent`
+        """
+        shift = epoch_ns - self._epoch_ns
+        with self._lock:
+            ids = {s.span_id: next(self._ids) for s in spans}
+            for s in spans:
+                self.spans.append(replace(
+                    s,
+                    span_id=ids[s.span_id],
+                    parent_id=ids.get(s.parent_id, parent),
+                    start_ns=s.start_ns + shift,
+                    end_ns=None if s.end_ns is None else s.end_ns + shift,
+                ))
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Returns the spans in the Chrome trace event format (chrome://tracing, Perfetto, speedscope)
+        """
+        events = [
+            {
+                "name": s.name,
+                "ph": "X",
+                "ts": (s.start_ns - self._origin_ns) / 1e3,
+                "dur": s.duration * 1e6,
+                "pid": s.process_id,
+                "tid": s.thread_id,
+                "args": {k: str(v) for k, v in s.attributes.items()},
+            }
+            for s in self.spans if s.end_ns is not None
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def to_otel(self, trace_id: str | None = None) -> list[dict]:
+        """
+        Returns the spans as OpenTelemetry span dicts (OTLP JSON field names)
+        """
+        trace_id = trace_id or os.urandom(16).hex()
+        return [
+            {
+                "traceId": trace_id,
+                "spanId": f"{s.span_id:016x}",
+                "parentSpanId": f"{s.parent_id:016x}" if s.parent_id is not None else "",
+                "name": s.name,
+                "startTimeUnixNano": s.start_ns + self._epoch_ns,
+                "endTimeUnixNano": s.end_ns + self._epoch_ns,
+                "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in s.attributes.items()],
+            }
+            for s in self.spans if s.end_ns is not None
+        ]
+
+    def summary(self, top: int | None = 10) -> pd.DataFrame:
+        """
+        Returns the time spent in each stage: number of calls, total time and self time (excluding nested stages), in seconds
+        """
+        finished = [s for s in self.spans if s.end_ns is not None]
+        children = {}
+        for s in finished:
+            if s.parent_id is not None:
+                children[s.parent_id] = children.get(s.parent_id, 0.0) + s.duration
+
+        df = pd.DataFrame({
+            "stage": [s.name for s in finished],
+            "total": [s.duration for s in finished],
+            "self_time": [max(0.0, s.duration - children.get(s.span_id, 0.0)) for s in finished],
+        })
+        res = (df.groupby("stage")
+               .agg(calls=("total", "size"), total=("total", "sum"), self_time=("self_time", "sum"))
+               .sort_values("self_time", ascending=False)
+               .reset_index())
+        return res.head(top) if top else res
@@ -0,0 +1,153 @@
+import numpy as np
+
+
+# raw columns identifying a row (the date is "time" for periods, "year" and "month" for a single month)
+_KEYS = ("time", "year", "month", "country_code", "port_code", "state_code", "product_code")
+
+
+class TradeResult:
+    """
+    Result of a query kept as the raw API rows, with NumPy accessors computed on demand.
+
+    Aggregates are computed from NumPy arrays (values, month ordinals, code indices) without
+    building a DataFrame; `to_pandas()` builds the usual DataFrame only when it is called.
+
+    With `dedup` (the client's `validate_results`), rows repeating the keys of a later row are
+    left out of the aggregates, as `validate` drops them from the DataFrame. The other checks of
+    `validate` only run on `to_pandas()`: suppressed values count as NaN in the aggregates.
+
+    Examples:
+        >>> res = c.get_imports("France", "08", "2025-01", lazy=True)
+        >>> res.total()
+        >>> res.by_country()
+        >>> res.to_pandas()
+    """
+
+    def __init__(self, header: list[str], rows: list[list], col_mapping: dict, materialize, dedup: bool = False):
+        self._header = header
+        self._all_rows = rows
+        self._materialize = materialize
+        self._names = [col_mapping.get(h, h) for h in header]
+        self._keys = [i for i, name in enumerate(self._names) if name in _KEYS] if dedup else []
+        self._unique = None
+        self._arrays = {}
+        self._frame = None
+
+    @property
+    def _rows(self) -> list[list]:
+        if not self._keys:
+            return self._all_rows
+        if self._unique is None:
+            # position of the last row of each key
+            last = {tuple(row[i] for i in self._keys): pos for pos, row in enumerate(self._all_rows)}
+            if len(last) == len(self._all_rows):
+                self._unique = self._all_rows
+            else:
+                self._unique = [self._all_rows[pos] for pos in sorted(last.values())]
+        return self._unique
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __repr__(self) -> str:
+        return f"TradeResult({len(self)} rows, columns={self.columns!r})"
+
+    @property
+    def columns(self) -> list[str]:
+        return list(dict.fromkeys(self._names))
+
+    @property
+    def value_columns(self) -> list[str]:
+        return [c for c in self.columns if c.endswith("_value")]
+
+    def _raw(self, name: str) -> list:
+        if not self._header:
+            return []
+        if name not in self._names:
+            raise KeyError(f"Column {name!r} is not in the result - available columns are {self.columns!r}")
+        i = self._names.index(name)
+        return [row[i] for row in self._rows]
+
+    def values(self, column: str | None = None) -> np.ndarray:
+        """
+        The values of a value column as floats (NaN where suppressed). Default uses the first value column.
+        """
+        column = column or (self.value_columns[0] if self.value_columns else None)
+        if column is None:
+            if not self._header:
+                return np.empty(0)
+            raise KeyError("The result has no value column")
+        if column not in self._arrays:
+            raw = self._raw(column)
+            try:
+                arr = np.asarray(raw, dtype=float)
+            except (TypeError, ValueError):
+                arr = np.array([_to_float(v) for v in raw], dtype=float)
+            self._arrays[column] = arr
+        return self._arrays[column]
+
+    def months(self) -> np.ndarray:
+        """
+        Month ordinals (year * 12 + month - 1) of the rows
+        """
+        if "_months" not in self._arrays:
+            if "time" in self._names:
+                raw = self._raw("time")
+                years = np.array([int(t[:4]) for t in raw], dtype=np.int64)
+                months = np.array([int(t[5:7]) for t in raw], dtype=np.int64)
+            else:
+                years = np.asarray(self._raw("year"), dtype=np.int64)
+                months = np.asarray(self._raw("month"), dtype=np.int64)
+            self._arrays["_months"] = years * 12 + months - 1
+        return self._arrays["_months"]
+
+    def codes(self, column: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The distinct codes of a column and the index of each row's code among them
+        """
+        if column not in self._arrays:
+            self._arrays[column] = np.unique(np.asarray(self._raw(column), dtype=str), return_inverse=True)
+        return self._arrays[column]
+
+    def total(self, value: str | None = None) -> float:
+        return float(np.nansum(self.values(value)))
+
+    def _group(self, labels: np.ndarray, index: np.ndarray, value: str | None) -> dict:
+        values = self.values(value)
+        sums = np.bincount(index, weights=np.nan_to_num(values), minlength=len(labels))
+        return dict(zip(labels.tolist(), sums.tolist()))
+
+    def by_country(self, value: str | None = None) -> dict[str, float]:
+        """
+        Sum of the values per country code
+        """
+        return self._group(*self.codes("country_code"), value)
+
+    def by_product(self, value: str | None = None) -> dict[str, float]:
+        """
+        Sum of the values per product code
+        """
+        return self._group(*self.codes("product_code"), value)
+
+    def by_month(self, value: str | None = None) -> dict[str, float]:
+        """
+        Sum of the values per month ('YYYY-MM')
+        """
+        ordinals, index = np.unique(self.months(), return_inverse=True)
+        labels = np.array([f"{o // 12}-{o % 12 + 1:02d}" for o in ordinals.tolist()])
+        return self._group(labels, index, value)
+
+    def to_pandas(self):
+        """
+        Builds the DataFrame returned by the non lazy query (once; later calls return the same frame)
+        """
+        if self._frame is None:
+            self._frame = self._materialize(self._header, self._all_rows)
+        return self._frame
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -0,0 +1,134 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .client import CensusClient
+from .errors import EmptyResult, USTradeError
+
+
+def _list(value: str | None) -> list[str] | None:
+    if value is None:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "TradeServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: str):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        route = self.server.routes.get(parts[0] if parts else "")
+        if route is None:
+            return self._send(404, json.dumps({"error": f"Unknown endpoint: {url.path}"}))
+
+        try:
+            status, body = route(self.server, parts[1:], params)
+        except EmptyResult as e:
+            status, body = 404, json.dumps({"error": str(e)})
+        except (USTradeError, ValueError, KeyError) as e:
+            status, body = 400, json.dumps({"error": str(e)})
+        except Exception as e:
+            status, body = 500, json.dumps({"error": f"{type(e).__name__}: {e}"})
+        self._send(status, body)
+
+
+def _flow(flux):
+    def handle(server, path, params):
+        if "country" not in params or "product" not in params:
+            raise ValueError("`country` and `product` are required")
+        kwargs = {"dataset": params.get("dataset", "hs"), "fields": _list(params.get("fields"))}
+        if not server.slots.acquire(timeout=server.queue_timeout):
+            return 503, json.dumps({"error": "Too many queries in progress, retry later"})
+        try:
+            c = server.client
+            if "date" in params:
+                dates = _list(params["date"])
+                date = dates[0] if len(dates) == 1 else dates
+                df = getattr(c, f"get_{flux}")(_list(params["country"]), _list(params["product"]), date, **kwargs)
+            else:
+                df = getattr(c, f"get_{flux}_on_period")(_list(params["country"]), _list(params["product"]),
+                                                         params["start"], params["end"], **kwargs)
+        finally:
+            server.slots.release()
+        return 200, df.to_json(orient="records", date_format="iso")
+    return handle
+
+
+def _codes(server, path, params):
+    c = server.client
+    if path:
+        product = c.get_product(path[0])
+        return 200, json.dumps({
+            "section": product.section,
+            "hscode": product.hscode,
+            "description": product.description,
+            "parent": product.parent,
+            "level": product.level,
+            "children": c.get_children_codes(product.hscode),
+        })
+    if "keyword" in params:
+        df = c.search_for_code(_list(params["keyword"]), mode=params.get("mode", "OR"), in_codes=params.get("in_codes"))
+    else:
+        level = int(params["level"]) if "level" in params else None
+        df = c.find_codes(section=params.get("section"), level=level, prefix=params.get("prefix"), as_frame=True)
+    return 200, df.to_json(orient="records")
+
+
+def _health(server, path, params):
+    c = server.client
+    return 200, json.dumps({
+        "status": "ok",
+        "coalesced_queries": c._inflight.shared,
+        **c.transfer_summary(),
+    }, default=str)
+
+
+class TradeServer(ThreadingHTTPServer):
+    """
+    HTTP server answering queries with a single shared `CensusClient`, so that every consumer
+    benefits from its loaded reference data, its response cache and its request coalescing.
+
+    Endpoints (GET, JSON):
+        /imports, /exports: country, product (comma separated), date or start and end, dataset, fields
+        /codes?keyword=...  /codes?section=XV&level=4  /codes/<hs>
+        /health
+
+    Args:
+        address (tuple[str, int]): host and port.
+        client (CensusClient): the client used for every query.
+        max_concurrent (int): maximum number of queries running at a time. Default uses 8.
+        queue_timeout (float): seconds a query waits for a slot before a 503 answer. Default uses 30.
+    """
+
+    daemon_threads = True
+
+    routes = {
+        "imports": _flow("imports"),
+        "exports": _flow("exports"),
+        "codes": _codes,
+        "health": _health,
+    }
+
+    def __init__(self, address: tuple[str, int], client: CensusClient, max_concurrent: int = 8,
+                 queue_timeout: float = 30, verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.client = client
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.queue_timeout = queue_timeout
+        self.verbose = verbose
@@ -0,0 +1,211 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True)
+class Shard:
+    countries: tuple
+    products: tuple
+    start: str
+    end: str
+
+
+def _month_index(date: str) -> int:
+    dt = datetime.strptime(date, "%Y-%m")
+    return dt.year * 12 + dt.month - 1
+
+
+def _month_str(idx: int) -> str:
+    return f"{idx // 12}-{idx % 12 + 1:02d}"
+
+
+def split_period(start: str, end: str, months_per_shard: int = 12) -> list[tuple[str, str]]:
+    """
+    Splits the period [start, end] in consecutive sub-periods of at most `months_per_shard` months
+    """
+    if months_per_shard < 1:
+        raise ValueError(f"months_per_shard must be positive - received {months_per_shard!r}")
+
+    first, last = _month_index(start), _month_index(end)
+    if first > last:
+        raise ValueError(f"Start date {start!r} is after end date {end!r}")
+
+    periods = []
+    for lo in range(first, last + 1, months_per_shard):
+        hi = min(lo + months_per_shard - 1, last)
+        periods.append((_month_str(lo), _month_str(hi)))
+    return periods
+
+
+def _chunk(items: list, size: int | None) -> list[tuple]:
+    if not size:
+        return [tuple(items)]
+    return [tuple(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def plan_shards(countries: list[str],
+                products: list[str],
+                start: str,
+                end: str,
+                months_per_shard: int = 12,
+                countries_per_shard: int | None = None) -> list[Shard]:
+    """
+    Plans a period query as a list of independent shards.
+
+    Args:
+        countries (list[str]): normalized Census country codes
+        products (list[str]): HS codes
+        start (str): start date in format 'YYYY-MM'
+        end (str): end date in format 'YYYY-MM'
+        months_per_shard (int): maximum number of months covered by one shard
+        countries_per_shard (int | None): maximum number of countries in one shard. None keeps all the countries together.
+    """
+    return [
+        Shard(countries=cty, products=tuple(products), start=lo, end=hi)
+        for lo, hi in split_period(start, end, months_per_shard)
+        for cty in _chunk(list(countries), countries_per_shard)
+    ]
+
+
+def replan_shards(shards: list[Shard], first: Shard, months_per_shard: int) -> list[Shard]:
+    """
+    The shards of a plan left to fetch once `first` has been fetched, with the months after
+    the period of `first` split again in sub-periods of `months_per_shard` months.
+
+    The other country groups of the period of `first` are kept as planned.
+    """
+    head = [s for s in shards if s.start == first.start]
+    last = max(_month_index(s.end) for s in shards)
+    rest = [
+        Shard(s.countries, s.products, lo, hi)
+        for lo, hi in split_period(_month_str(_month_index(first.end) + 1), _month_str(last), months_per_shard)
+        for s in head
+    ] if _month_index(first.end) < last else []
+    return [s for s in head if s != first] + rest
+
+
+def coalesce_months(months: list[str]) -> list[tuple[str, str]]:
+    """
+    Groups a list of months ('YYYY-MM') in runs of consecutive months, returned as (start, end) periods
+    """
+    indices = sorted({_month_index(m) for m in months})
+    runs = []
+    for idx in indices:
+        if runs and idx == runs[-1][1] + 1:
+            runs[-1][1] = idx
+        else:
+            runs.append([idx, idx])
+    return [(_month_str(lo), _month_str(hi)) for lo, hi in runs]
+
+
+def split_shard(shard: Shard) -> list[Shard] | None:
+    """
+    Splits a shard in two halves: by period when it covers several months, otherwise by countries.
+    Returns None when the shard cannot be split.
+    """
+    first, last = _month_index(shard.start), _month_index(shard.end)
+    if last > first:
+        mid = (first + last) // 2
+        return [Shard(shard.countries, shard.products, shard.start, _month_str(mid)),
+                Shard(shard.countries, shard.products, _month_str(mid + 1), shard.end)]
+    if len(shard.countries) > 1:
+        mid = len(shard.countries) // 2
+        return [Shard(shard.countries[:mid], shard.products, shard.start, shard.end),
+                Shard(shard.countries[mid:], shard.products, shard.start, shard.end)]
+    return None
+
+
+def shard_cells(shard: Shard) -> int:
+    """
+    Number of country x product x month combinations covered by a shard
+    """
+    months = _month_index(shard.end) - _month_index(shard.start) + 1
+    return len(shard.countries) * len(shard.products) * months
+
+
+class ShardSizer:
+    """
+    Running statistics of the responses of each endpoint, used to size the shards of a period query.
+
+    For each endpoint, exponentially weighted averages of the rows returned and of the seconds
+    taken per country x product x month are kept; shards are then given as many months as fit
+    in `target_rows` rows and `target_seconds` seconds. A timeout counts as a response that took
+    the whole timeout, so the following shards get smaller.
+
+    Args:
+        target_rows (int): rows aimed at in one response. Default uses 100 000.
+        target_seconds (float): latency aimed at for one response. Default uses 20.
+        alpha (float): weight of the latest observation in the averages. Default uses 0.3.
+        default_months (int): months per shard before anything was observed. Default uses 12.
+        max_months (int): upper bound of the months per shard. Default uses 120.
+    """
+
+    def __init__(self, target_rows: int = 100_000, target_seconds: float = 20.0, alpha: float = 0.3,
+                 default_months: int = 12, max_months: int = 120):
+        self.target_rows = target_rows
+        self.target_seconds = target_seconds
+        self.alpha = alpha
+        self.default_months = default_months
+        self.max_months = max_months
+        self._stats: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+        # when a list, every observation is also appended to it, to be replayed in another sizer
+        self.journal: list | None = None
+
+    def _update(self, endpoint, rows_per_cell: float | None, seconds_per_cell: float):
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                self._stats[endpoint] = [rows_per_cell or 0.0, seconds_per_cell]
+                return
+            if rows_per_cell is not None:
+                stats[0] += self.alpha * (rows_per_cell - stats[0])
+            stats[1] += self.alpha * (seconds_per_cell - stats[1])
+
+    def observe(self, endpoint, cells: int, rows: int, seconds: float):
+        if self.journal is not None:
+            self.journal.append(("observe", (endpoint, cells, rows, seconds)))
+        if cells > 0:
+            self._update(endpoint, rows / cells, seconds / cells)
+
+    def observe_timeout(self, endpoint, cells: int, timeout: float):
+        if self.journal is not None:
+            self.journal.append(("observe_timeout", (endpoint, cells, timeout)))
+        if cells > 0:
+            with self._lock:
+                stats = self._stats.get(endpoint)
+                spc = timeout / cells
+                if stats is None:
+                    self._stats[endpoint] = [0.0, spc]
+                else:
+                    stats[1] = max(stats[1], spc)
+
+    def replay(self, journal: list):
+        """
+        Records the observations of the journal of another sizer
+        """
+        for method, args in journal:
+            getattr(self, method)(*args)
+
+    def stats(self, endpoint) -> dict | None:
+        """
+        The current averages of the endpoint: rows and seconds per country x product x month
+        """
+        with self._lock:
+            stats = self._stats.get(endpoint)
+        return None if stats is None else {"rows_per_cell": stats[0], "seconds_per_cell": stats[1]}
+
+    def months_per_shard(self, endpoint, countries: int, products: int) -> int:
+        stats = self.stats(endpoint)
+        if stats is None:
+            return self.default_months
+        cells = float("inf")
+        if stats["rows_per_cell"] > 0:
+            cells = self.target_rows / stats["rows_per_cell"]
+        if stats["seconds_per_cell"] > 0:
+            cells = min(cells, self.target_seconds / stats["seconds_per_cell"])
+        if cells == float("inf"):
+            return self.max_months
+        months = int(cells // max(1, countries * products))
+        return max(1, min(self.max_months, months))
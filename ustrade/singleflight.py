@@ -0,0 +1,52 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time: callers arriving while a call for the same key
+    is running wait for it and receive its result (or its exception) instead of running it again.
+
+    `do` returns the result and whether it was handed to more than one caller: only a shared
+    result needs to be copied before it is modified.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self.shared = 0
+
+    def do(self, key: str, fn) -> tuple[object, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # once the key is removed no caller can join: the number of followers is final
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, call.followers > 0
@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TransferStats:
+    url: str
+    encoding: str | None
+    compressed_bytes: int | None
+    decoded_bytes: int | None
+    elapsed: float
+
+    @property
+    def ratio(self) -> float | None:
+        """
+        Compression ratio of the response (decoded size / transferred size)
+        """
+        if not self.compressed_bytes or self.decoded_bytes is None:
+            return None
+        return self.decoded_bytes / self.compressed_bytes
+
+
+def _measure(url: str, response, elapsed: float) -> TransferStats:
+    headers = getattr(response, "headers", None) or {}
+    content = getattr(response, "content", None)
+    decoded = len(content) if isinstance(content, (bytes, bytearray)) else None
+
+    compressed = None
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        compressed = raw.tell() or None
+    if compressed is None and "Content-Length" in headers:
+        compressed = int(headers["Content-Length"])
+    if compressed is None and not headers.get("Content-Encoding"):
+        compressed = decoded
+
+    return TransferStats(
+        url=url,
+        encoding=headers.get("Content-Encoding"),
+        compressed_bytes=compressed,
+        decoded_bytes=decoded,
+        elapsed=elapsed,
+    )
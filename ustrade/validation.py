@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+_KEYS = ("date", "country_code", "port_code", "state_code", "product_code")
+
+# length of an HS code -> length of its parent
+_PARENT_LENGTH = {4: 2, 6: 4, 10: 6}
+
+
+@dataclass
+class ValidationReport:
+    """
+    Outcome of `validate` on a result.
+
+    Attributes:
+        rows (int): number of rows checked.
+        duplicates (int): rows removed because another row had the same keys.
+        missing (int): rows with a suppressed or missing value.
+        mismatches (pd.DataFrame): parent codes whose value differs from the sum of their children,
+            with columns keys..., "value", "parent_value", "children_sum".
+    """
+    rows: int = 0
+    duplicates: int = 0
+    missing: int = 0
+    mismatches: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+    @property
+    def ok(self) -> bool:
+        return not self.duplicates and not self.missing and self.mismatches.empty
+
+
+def _parents(codes: pd.Series) -> pd.Series:
+    codes = codes.astype(str)
+    lengths = codes.str.len()
+    parent = pd.Series(None, index=codes.index, dtype=object)
+    for length, parent_length in _PARENT_LENGTH.items():
+        mask = (lengths == length).to_numpy()
+        if mask.any():
+            parent[mask] = codes[mask].str[:parent_length]
+    return parent
+
+
+def check_hierarchy(df: pd.DataFrame, keys=None, values=None, children_count: dict | None = None,
+                    rtol: float = 1e-3, atol: float = 1.0) -> pd.DataFrame:
+    """
+    Returns the parent codes whose value differs from the sum of the values of their children.
+
+    Args:
+        df (pd.DataFrame): a result with a "product_code" column.
+        keys (list[str] | None): the columns identifying a row. Default uses the standard key columns of `df`.
+        values (list[str] | None): the compared columns. Default uses the columns ending with "_value".
+        children_count (dict | None): number of children of each code; when given, parents are only
+            compared when all their children are in `df`.
+        rtol (float), atol (float): tolerance of the comparison.
+    """
+    keys = list(keys) if keys is not None else [k for k in _KEYS if k in df.columns]
+    values = list(values) if values is not None else [c for c in df.columns if c.endswith("_value")]
+    others = [k for k in keys if k != "product_code"]
+    columns = others + ["product_code", "value", "parent_value", "children_sum"]
+    if "product_code" not in df.columns or df.empty or not values:
+        return pd.DataFrame(columns=columns)
+
+    parent = _parents(df["product_code"])
+    children = df[parent.notna().to_numpy()]
+    if children.empty:
+        return pd.DataFrame(columns=columns)
+
+    groups = children.groupby(others + [parent[parent.notna()].rename("product_code")],
+                              sort=False, dropna=False, observed=True)
+    sums = groups[values].sum(min_count=1)
+    sums["_count"] = groups.size()
+    sums = sums.reset_index()
+    if children_count is not None:
+        expected = sums["product_code"].map(children_count)
+        sums = sums[(sums["_count"] == expected).to_numpy()]
+
+    parents = df[others + ["product_code"] + values].astype({"product_code": str})
+    sums["product_code"] = sums["product_code"].astype(str)
+    both = parents.merge(sums, on=others + ["product_code"], how="inner", suffixes=("", "_children"))
+
+    found = []
+    for v in values:
+        p, s = both[v].to_numpy(dtype=float), both[v + "_children"].to_numpy(dtype=float)
+        bad = ~np.isclose(p, s, rtol=rtol, atol=atol) & ~np.isnan(p) & ~np.isnan(s)
+        if bad.any():
+            found.append(both.loc[bad, others + ["product_code"]]
+                         .assign(value=v, parent_value=p[bad], children_sum=s[bad]))
+    if not found:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(found, ignore_index=True)[columns]
+
+
+def validate(df: pd.DataFrame, keys=None, values=None, children_count: dict | None = None,
+             hierarchy: bool = True, rtol: float = 1e-3, atol: float = 1.0) -> tuple[pd.DataFrame, ValidationReport]:
+    """
+    Cleans a result in one pass: removes rows with duplicate keys (the last one is kept), flags
+    suppressed or missing values in a boolean "suppressed" column, and checks that the values of
+    HS codes match the sum of their children when both are present.
+
+    Args:
+        df (pd.DataFrame): a result.
+        keys (list[str] | None): the columns identifying a row. Default uses the standard key columns of `df`.
+        values (list[str] | None): the value columns. Default uses the columns ending with "_value".
+        children_count (dict | None): number of children of each code (see `check_hierarchy`).
+        hierarchy (bool): run the parent / children check. Default uses True.
+
+    Returns:
+        tuple[pd.DataFrame, ValidationReport]: the cleaned result and what was found.
+
+    Examples:
+        >>> clean, report = validate(df)
+        >>> report.duplicates, report.mismatches
+    """
+    keys = list(keys) if keys is not None else [k for k in _KEYS if k in df.columns]
+    values = list(values) if values is not None else [c for c in df.columns if c.endswith("_value")]
+    report = ValidationReport(rows=len(df))
+    if df.empty:
+        return df, report
+
+    if keys:
+        dup = df.duplicated(subset=keys, keep="last").to_numpy()
+        report.duplicates = int(dup.sum())
+        if report.duplicates:
+            df = df[~dup].reset_index(drop=True)
+
+    if values:
+        suppressed = df[values].isna().any(axis=1)
+        report.missing = int(suppressed.sum())
+        df = df.assign(suppressed=suppressed.to_numpy())
+
+    if hierarchy:
+        report.mismatches = check_hierarchy(df, keys, values, children_count=children_count, rtol=rtol, atol=atol)
+    return df, report